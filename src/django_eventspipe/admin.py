@@ -1,9 +1,10 @@
 from django import forms
 from django.contrib import admin
+from django.db.models import Prefetch
 from django.utils.html import format_html
 from django.urls import reverse
 
-from .utils import linkify, PrettyJSONEncoder
+from .utils import linkify, EstimatedCountPaginator, PrettyJSONEncoder
 
 from .models import (
     PipelineDefinition,
@@ -12,6 +13,7 @@ from .models import (
     TaskDefinition,
     Pipeline,
     PipelineArtifact,
+    PipelineLog,
     EventSchedule
 )
 
@@ -25,7 +27,8 @@ class InlineTask(admin.TabularInline):
         '_name',
         'node',
         'start_ts',
-        'end_ts'
+        'end_ts',
+        'celery_id'
     ]
     exclude = [
         'definition',
@@ -46,9 +49,28 @@ class InlineTask(admin.TabularInline):
             )
         )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("definition__task_definition")
+
     def _name(self, obj):
         return "%s" % obj.definition.task_definition.function
 
+class InlinePipelineLog(admin.TabularInline):
+    model = PipelineLog
+    extra = 0
+    ordering = ("pk",)
+    can_delete = False
+    readonly_fields = [
+        'timestamp',
+        'message'
+    ]
+    exclude = [
+        'task'
+    ]
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 class JsonOptionsForm(forms.ModelForm):
     options = forms.JSONField(
         encoder=PrettyJSONEncoder,
@@ -67,6 +89,9 @@ class InlineTaskDefinition(admin.TabularInline):
     ordering = ("order",)
     exclude = ['options']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("task_definition")
+
     def _name(self, obj):
         """
         Get Job function name from JobDefinition object
@@ -84,8 +109,13 @@ class PipelineAdmin(admin.ModelAdmin):
         "start_ts",
         "end_ts"
     )
+    list_filter = ("status",)
+    list_select_related = ("user",)
+    ordering = ("-start_ts",)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     readonly_fields = []
-    inlines = [InlineTask]
+    inlines = [InlineTask, InlinePipelineLog]
 
     # https://stackoverflow.com/a/19884095
     def get_readonly_fields(self, request, obj=None):
@@ -103,7 +133,7 @@ class PipelineAdmin(admin.ModelAdmin):
         """
         Read job's status properly
         """
-        colors = ["#2196F3","#04AA6D","#f23232", "#f8f8f8"]
+        colors = ["#2196F3","#04AA6D","#f23232", "#f8f8f8", "#ffc107"]
         return format_html(
             "<span style=\"background-color:%s;display:block;text-align:center;font-size:0.6rem;padding:1px;max-width:55px;\"><b>%s</b></span>" 
             % (
@@ -121,6 +151,7 @@ class EventScheduleAdmin(admin.ModelAdmin):
         "user",
         "event",
     )
+    list_select_related = ("user",)
     form = JsonEventForm
 
     @admin.action(description="Disable selected EventSchedule")
@@ -155,6 +186,14 @@ class PipelineDefinitionAdmin(admin.ModelAdmin):
     inlines = [InlineTaskDefinition]
     form = JsonOptionsForm
 
+    def get_queryset(self, request):
+        # Task definitions of every row with a single query, for `tasks_definition`
+        return super().get_queryset(request).prefetch_related(Prefetch(
+            "pipelinedefinitiontaskdefinition_set",
+            queryset = PipelineDefinitionTaskDefinition.objects.select_related("task_definition").order_by("order", "pk"),
+            to_attr  = "ordered_tasks"
+        ))
+
     @admin.action(description="Disable selected PipelineDefinition")
     def disable_selection(self, request, queryset):
         for object in queryset:
@@ -188,14 +227,22 @@ class PipelineDefinitionAdmin(admin.ModelAdmin):
         Return a "pretty" tasks execution order view 
         """
         rt_string = ""
-        for definition in PipelineDefinitionTaskDefinition.objects.filter(pipeline_definition=obj).order_by('order'):
+        stage = None
+        for definition in obj.ordered_tasks:
             if definition.enabled:
                 job_name = definition.task_definition.function
             else:
                 # task is disabled, Strikethrough the function name
                 job_name = "<s style=\"color:var(--delete-button-bg)\">%s</s>" % definition.task_definition.function
 
-            rt_string = "%s <span style=\"color:var(--link-fg)\">→</span> %s" % (rt_string, job_name)
+            if definition.enabled and definition.stage is not None and definition.stage == stage:
+                # task runs in parallel with the previous one
+                rt_string = "%s <span style=\"color:var(--link-fg)\">+</span> %s" % (rt_string, job_name)
+            else:
+                rt_string = "%s <span style=\"color:var(--link-fg)\">→</span> %s" % (rt_string, job_name)
+
+            if definition.enabled:
+                stage = definition.stage
 
         return format_html(rt_string)
 
@@ -213,14 +260,21 @@ class PipelineArtifactAdmin(admin.ModelAdmin):
         "pk",
         "file_name",
         "_size",
-        "artifact__md5sum",
+        "artifact__checksum",
         linkify("pipeline"),
         "timestamp",
         "download"
     )
+    list_select_related = ("pipeline", "artifact")
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
     readonly_fields = []
 
+    def get_queryset(self, request):
+        # Never load artifacts content, sizes are stored
+        return super().get_queryset(request).defer("artifact__data")
+
     # https://stackoverflow.com/a/19884095
     def get_readonly_fields(self, request, obj=None):
         return list(self.readonly_fields) + \
@@ -238,4 +292,4 @@ class PipelineArtifactAdmin(admin.ModelAdmin):
         return format_html("<a class='button' href='%s'>📝 DOWNLOAD</a>" % url)
 
     def _size(self, obj: PipelineArtifact) -> str:
-        return "%s KB" % str(obj.artifact.size)
+        return "%s KB" % str(obj.artifact.size / 1000)
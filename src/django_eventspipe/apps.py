@@ -6,4 +6,5 @@ class DjangoEventspipeConfig(AppConfig):
     verbose_name = 'Automations'
 
     def ready(self):
+        import django_eventspipe.checks
         import django_eventspipe.signals
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+def is_process_local(cache: object) -> bool:
+    """
+    Check if a cache isn't shared between processes
+    """
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+@checks.register(checks.Tags.caches)
+def check_dedupe_cache(app_configs, **kwargs) -> list[checks.CheckMessage]:
+    """
+    Dedupe keys must be claimed in a cache shared by every worker
+    """
+    from .dedupe import get_dedupe_cache
+
+    if not is_process_local(get_dedupe_cache()):
+        return []
+
+    # events are deduplicated by their fields, process-local claims are a misconfiguration
+    level = checks.Error if getattr(settings, "EVENTSPIPE_DEDUPE_FIELDS", None) else checks.Warning
+
+    return [level(
+        "EVENTSPIPE_DEDUPE_CACHE uses a process-local cache backend, "
+        "duplicated events reaching different workers are not dropped.",
+        hint = "Set EVENTSPIPE_DEDUPE_CACHE to a cache alias shared by every web and celery worker.",
+        id   = "django_eventspipe.E001" if level is checks.Error else "django_eventspipe.W001",
+    )]
+
+@checks.register(checks.Tags.caches)
+def check_versions_cache(app_configs, **kwargs) -> list[checks.CheckMessage]:
+    """
+    Cached definitions are invalidated through versions kept in the default cache
+    """
+    if not is_process_local(caches[DEFAULT_CACHE_ALIAS]):
+        return []
+
+    return [checks.Warning(
+        "The default cache uses a process-local cache backend, PipelineDefinition changes "
+        "reach other workers only after EVENTSPIPE_CACHE_TTL seconds.",
+        hint = "Use a default cache shared by every web and celery worker.",
+        id   = "django_eventspipe.W002",
+    )]
@@ -0,0 +1,89 @@
+import lzma
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class Identity:
+    """
+    No-op compressor and decompressor
+    """
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    decompress = compress
+
+    def flush(self) -> bytes:
+        return b""
+
+class LZMADecompressor:
+    """
+    `lzma.LZMADecompressor` with a flush method
+    """
+    def __init__(self) -> None:
+        self.decompressor = lzma.LZMADecompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+class ZstdDecompressor:
+    """
+    `zstandard` decompressor with a flush method
+    """
+    def __init__(self) -> None:
+        self.decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+# codec -> (compressor factory, decompressor factory)
+CODECS = {
+    "none" : (Identity, Identity),
+    "zlib" : (zlib.compressobj, zlib.decompressobj),
+    "gzip" : (lambda: zlib.compressobj(wbits=31), lambda: zlib.decompressobj(wbits=31)),
+    "lzma" : (lzma.LZMACompressor, LZMADecompressor),
+}
+
+if zstandard is not None:
+    CODECS["zstd"] = (lambda: zstandard.ZstdCompressor().compressobj(), ZstdDecompressor)
+
+# codec -> HTTP Content-Encoding, for codecs that can be served as is
+CONTENT_ENCODINGS = {
+    "gzip" : "gzip",
+    "zlib" : "deflate",
+    "zstd" : "zstd",
+}
+
+CODEC_CHOICES = [
+    ("none", "none"),
+    ("zlib", "zlib"),
+    ("gzip", "gzip"),
+    ("lzma", "lzma"),
+    ("zstd", "zstd"),
+]
+
+def get_compressor(codec: str) -> object:
+    """
+    Get a streaming compressor for a codec
+    """
+    if codec not in CODECS:
+        raise ValueError("Unsupported codec '%s'" % codec)
+
+    return CODECS[codec][0]()
+
+def get_decompressor(codec: str) -> object:
+    """
+    Get a streaming decompressor for a codec
+    """
+    if codec not in CODECS:
+        raise ValueError("Unsupported codec '%s'" % codec)
+
+    return CODECS[codec][1]()
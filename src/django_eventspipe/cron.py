@@ -0,0 +1,70 @@
+from functools import cached_property, lru_cache
+
+from celery import schedules
+
+from django.conf import settings
+
+from .utils import cronexp
+
+class CronExpression:
+    """
+    Parsed five-field cron expression (minute hour day_of_month month_of_year day_of_week).
+    Instances are shared through `get_cron`, parsing happens once per expression.
+    """
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+
+    def __repr__(self) -> str:
+        return "<CronExpression: %s>" % self.expression
+
+    @cached_property
+    def error(self) -> str | None:
+        """
+        Validation error of the expression, None when valid
+        """
+        from .validators import _CronSlices
+
+        try:
+            _CronSlices.validate(self.expression)
+        except ValueError as e:
+            return str(e)
+
+        return None
+
+    @cached_property
+    def schedule(self) -> schedules.crontab:
+        """
+        Celery's crontab schedule of the expression
+        """
+        minute, hour, day_of_month, month_of_year, day_of_week = self.expression.split(" ")
+
+        return schedules.crontab(
+            minute        = minute,
+            hour          = hour,
+            day_of_week   = day_of_week,
+            day_of_month  = day_of_month,
+            month_of_year = month_of_year,
+        )
+
+@lru_cache(maxsize=getattr(settings, "EVENTSPIPE_CRON_CACHE_SIZE", 1024))
+def get_cron(expression: str) -> CronExpression:
+    """
+    Get the shared `CronExpression` of an expression
+    """
+    return CronExpression(expression)
+
+def get_cron_key(
+    minute: str,
+    hour: str,
+    day_of_month: str,
+    month_of_year: str,
+    day_of_week: str
+) -> str:
+    """
+    Normalized five-field cron expression
+    """
+    return " ".join(
+        cronexp(field)
+        for field in (minute, hour, day_of_month, month_of_year, day_of_week)
+    )
@@ -8,7 +8,13 @@ from .exceptions import TaskFailed
 
 def tracked_task(func):
     @wraps(func)
-    def wrapper(self, context: dict[str, object], *args, **kw) -> dict[str, object]:
+    def wrapper(
+        self, 
+        context: dict[str, object], 
+        *args, 
+        pipeline_task: int | None = None, 
+        **kw
+    ) -> dict[str, object]:
         
         # HACK: Get task name
         if str(func.__name__) in str(func.__module__):
@@ -20,15 +26,26 @@ def tracked_task(func):
         self.pipeline = Pipeline.objects.get(pk=context["pipeline"])
         
         # Get current pipeline's task
-        pipeline_task = Task.objects.get(
-            pipeline=self.pipeline, 
-            definition__task_definition__function=taskname
-        )
+        if pipeline_task is not None:
+            # Task's pk is known, no need to query it
+            pipeline_task = Task(pk=pipeline_task, pipeline=self.pipeline)
+        else:
+            pipeline_task = Task.objects.get(
+                pipeline=self.pipeline, 
+                definition__task_definition__function=taskname
+            )
+
+        # Buffer logs until the end of this Task
+        self.pipeline.start_log_buffer(task=pipeline_task.pk)
 
         self.pipeline.log("executing '%s'..." % taskname)
 
-        # Start Task's tracking
-        pipeline_task.tracking_start(node=platform.node())
+        # Start Task's tracking, unless it failed along with its pipeline
+        if not pipeline_task.tracking_start(node=platform.node()):
+            self.pipeline.log("'%s' skipped, pipeline already failed." % taskname)
+            self.pipeline.flush_logs()
+
+            raise TaskFailed
 
         try:
             # Execute Task
@@ -46,7 +63,12 @@ def tracked_task(func):
 
             raise TaskFailed
 
-        self.pipeline.log("'%s' execution complete." % taskname)
+        else:
+            self.pipeline.log("'%s' execution complete." % taskname)
+
+        finally:
+            # Write buffered logs
+            self.pipeline.flush_logs()
 
         return result
 
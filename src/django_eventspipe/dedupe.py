@@ -0,0 +1,67 @@
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEDUPE_KEY_PREFIX = "django_eventspipe:dedupe:"
+
+def get_dedupe_cache() -> object:
+    """
+    Get the cache holding dedupe keys, set by `EVENTSPIPE_DEDUPE_CACHE`.
+    It must be shared by every web and celery worker (memcached, redis, database...),
+    a process-local cache only drops duplicates delivered to the same process.
+    """
+    return caches[getattr(settings, "EVENTSPIPE_DEDUPE_CACHE", "default")]
+
+def get_dedupe_key(event: dict[str, object]) -> str | None:
+    """
+    Get the dedupe key of an event: its "dedupe_key" value or,
+    when `EVENTSPIPE_DEDUPE_FIELDS` is set, a hash of those fields.
+    Events without a dedupe key are never deduplicated.
+    """
+    if "dedupe_key" in event:
+        value = str(event["dedupe_key"])
+    else:
+        fields = getattr(settings, "EVENTSPIPE_DEDUPE_FIELDS", None)
+
+        if not fields:
+            return None
+
+        value = json.dumps([event.get(field) for field in fields], sort_keys=True, default=str)
+
+    return DEDUPE_KEY_PREFIX + hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+def deduplicate(events: list[dict[str, object]]) -> tuple[list[dict[str, object]], list[str]]:
+    """
+    Drop events already received in the last `EVENTSPIPE_DEDUPE_WINDOW` seconds.
+    Return the unique events and the dedupe keys they claimed.
+    """
+    window = getattr(settings, "EVENTSPIPE_DEDUPE_WINDOW", 300)
+    unique = []
+    keys   = []
+
+    for event in events:
+        key = get_dedupe_key(event)
+
+        if key is not None:
+            # cache.add is atomic, only the first delivery claims the key
+            if not get_dedupe_cache().add(key, 1, timeout=window):
+                logger.info("dropping duplicated event '%s'" % str(event))
+                continue
+
+            keys.append(key)
+
+        unique.append(event)
+
+    return unique, keys
+
+def release(keys: list[str]) -> None:
+    """
+    Release dedupe keys of events that failed to be processed
+    """
+    if keys:
+        get_dedupe_cache().delete_many(keys)
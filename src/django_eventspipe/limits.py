@@ -0,0 +1,155 @@
+import time
+
+from celery import signature as celery_signature
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .routing import DEFINITIONS_VERSION_KEY
+from .utils import VersionedCache
+
+def take_tokens(
+    definition: object,
+    tokens: float,
+    elapsed: float,
+    count: int
+) -> tuple[float, int, float]:
+    """
+    Refill a token bucket after `elapsed` seconds and take up to `count` tokens.
+    Return the tokens left, the tokens taken and the seconds until the next token.
+    """
+    interval = max(definition.rate_interval, 1)
+
+    if definition.rate_limit <= 0:
+        # nothing can start, check again after an interval
+        return 0.0, 0, float(interval)
+
+    rate   = definition.rate_limit / interval
+    tokens = min(float(definition.rate_limit), tokens + elapsed * rate)
+    taken  = min(count, int(tokens))
+    tokens = tokens - taken
+
+    return tokens, taken, max(1 - tokens, 0) / rate
+
+class DatabaseRateLimiter:
+    """
+    Token buckets stored in `PipelineDefinitionBucket` rows
+    """
+    def acquire(self, definition: object, count: int) -> tuple[int, float]:
+        PipelineDefinitionBucket = apps.get_model("django_eventspipe.PipelineDefinitionBucket")
+
+        bucket = PipelineDefinitionBucket.lock(definition)
+        now    = timezone.now()
+
+        bucket.tokens, taken, retry_after = take_tokens(
+            definition,
+            bucket.tokens,
+            (now - bucket.updated_ts).total_seconds(),
+            count
+        )
+        bucket.updated_ts = now
+        bucket.save(update_fields=["tokens", "updated_ts"])
+
+        return taken, retry_after
+
+class CacheRateLimiter:
+    """
+    Token buckets stored in the django cache, updates are guarded by a `cache.add` lock
+    """
+    def acquire(self, definition: object, count: int) -> tuple[int, float]:
+        key  = "django_eventspipe:bucket:%d" % definition.pk
+        lock = key + ":lock"
+
+        for _ in range(100):
+            if cache.add(lock, 1, timeout=5):
+                break
+            time.sleep(0.01)
+        else:
+            # bucket busy, retry later
+            return 0, 1.0
+
+        try:
+            now = time.time()
+            tokens, updated = cache.get(key, (float(definition.rate_limit), now))
+
+            tokens, taken, retry_after = take_tokens(definition, tokens, now - updated, count)
+            cache.set(key, (tokens, now), timeout=definition.rate_interval * 2)
+        finally:
+            cache.delete(lock)
+
+        return taken, retry_after
+
+def get_rate_limiter() -> DatabaseRateLimiter | CacheRateLimiter:
+    """
+    Get the rate limiter set by `EVENTSPIPE_RATE_LIMITER`, token buckets are stored in the database by default
+    """
+    return import_string(
+        getattr(settings, "EVENTSPIPE_RATE_LIMITER", "django_eventspipe.limits.DatabaseRateLimiter")
+    )()
+
+def lock(definition: object) -> None:
+    """
+    Serialize admissions of a `PipelineDefinition`'s Pipelines until the current transaction ends
+    """
+    PipelineDefinitionBucket = apps.get_model("django_eventspipe.PipelineDefinitionBucket")
+
+    PipelineDefinitionBucket.lock(definition)
+
+def admit(definition: object, count: int, exclude: list[int] | None = None) -> tuple[int, float | None]:
+    """
+    Get how many of `count` Pipelines of a `PipelineDefinition` may start now,
+    and the seconds until a rate limited definition can start more of them.
+    Must be called with the definition locked, within the transaction 
+    starting the admitted Pipelines.
+    """
+    Pipeline = apps.get_model("django_eventspipe.Pipeline")
+
+    retry_after = None
+
+    if definition.max_concurrency is not None:
+        active = Pipeline.objects.filter(definition=definition, status__in=[0, 3])
+
+        if exclude:
+            active = active.exclude(pk__in=exclude)
+
+        count = min(count, max(definition.max_concurrency - active.count(), 0))
+
+    if definition.rate_limit is not None and count > 0:
+        count, retry_after = get_rate_limiter().acquire(definition, count)
+
+    return count, retry_after
+
+def schedule_release(definition_pk: int, countdown: float = 0) -> None:
+    """
+    Start throttled Pipelines of a `PipelineDefinition` in `countdown` seconds,
+    once the current transaction commits
+    """
+    if countdown > 0:
+        # A single delayed release per definition at once
+        if not cache.add("django_eventspipe:release:%d" % definition_pk, 1, timeout=int(countdown) + 1):
+            return
+
+    transaction.on_commit(lambda: celery_signature(
+        "django_eventspipe.tasks.release_pipelines",
+        args = (definition_pk,)
+    ).apply_async(countdown=countdown))
+
+class LimitedDefinitions(VersionedCache):
+    """
+    Process-local set of `PipelineDefinition` pks having a concurrency cap or a rate limit
+    """
+    version_key = DEFINITIONS_VERSION_KEY
+
+    def build(self) -> set[int]:
+        PipelineDefinition = apps.get_model("django_eventspipe.PipelineDefinition")
+
+        return set(PipelineDefinition.objects.filter(
+            Q(max_concurrency__isnull=False) | Q(rate_limit__isnull=False)
+        ).values_list("pk", flat=True))
+
+limited_definitions = LimitedDefinitions()
@@ -0,0 +1,76 @@
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.admin.models import LogEntry, ADDITION
+from django.contrib.contenttypes.models import ContentType
+from django.utils.module_loading import import_string
+
+class PipelineLogSink:
+    """
+    Store `PipelineLog` objects in their own table
+    """
+    def write(self, entries: list[object]) -> None:
+        PipelineLog = apps.get_model("django_eventspipe.PipelineLog")
+
+        PipelineLog.objects.bulk_create(entries)
+
+class LogEntrySink:
+    """
+    Store `PipelineLog` objects as django admin's `LogEntry`
+    """
+    def write(self, entries: list[object]) -> None:
+        Pipeline = apps.get_model("django_eventspipe.Pipeline")
+
+        content_type_id = ContentType.objects.get_for_model(Pipeline).pk
+
+        LogEntry.objects.bulk_create([
+            LogEntry(
+                action_time     = entry.timestamp,
+                user_id         = entry.pipeline.user_id,
+                content_type_id = content_type_id,
+                object_id       = str(entry.pipeline_id),
+                object_repr     = "Pipeline #%d" % entry.pipeline_id,
+                action_flag     = ADDITION,
+                change_message  = entry.message
+            )
+            for entry in entries
+        ])
+
+def get_log_sink() -> PipelineLogSink | LogEntrySink:
+    """
+    Get the configured log sink, `EVENTSPIPE_LOG_BACKEND` setting
+    """
+    return import_string(
+        getattr(settings, "EVENTSPIPE_LOG_BACKEND", "django_eventspipe.logs.PipelineLogSink")
+    )()
+
+class LogBuffer:
+    """
+    Accumulate `PipelineLog` objects and write them in batches, 
+    when `EVENTSPIPE_LOG_BUFFER_SIZE` lines or `EVENTSPIPE_LOG_BUFFER_INTERVAL`
+    seconds are reached, or when flushed.
+    """
+
+    def __init__(self, sink: PipelineLogSink | LogEntrySink | None = None) -> None:
+        self.sink      = sink or get_log_sink()
+        self.entries   = []
+        self.max_size  = getattr(settings, "EVENTSPIPE_LOG_BUFFER_SIZE", 100)
+        self.max_age   = getattr(settings, "EVENTSPIPE_LOG_BUFFER_INTERVAL", 5)
+        self.started   = None
+
+    def write(self, entry: object) -> None:
+        if not self.entries:
+            self.started = time.monotonic()
+
+        self.entries.append(entry)
+
+        if len(self.entries) >= self.max_size or time.monotonic() - self.started >= self.max_age:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.entries:
+            return
+
+        entries, self.entries = self.entries, []
+        self.sink.write(entries)
@@ -0,0 +1,103 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from django_eventspipe.limits import LimitedDefinitions
+from django_eventspipe.models import (
+    Artifact,
+    EventSchedule,
+    EventScheduleVersion,
+    Pipeline,
+    PipelineArtifact,
+    PipelineDefinition,
+    PipelineDefinitionTaskDefinition,
+    Task
+)
+from django_eventspipe.plans import PipelinePlans
+from django_eventspipe.routing import RoutingIndex
+
+# sequential scans in EXPLAIN output, by database vendor
+SCAN_PATTERNS = {
+    "sqlite"     : re.compile(r"\bSCAN (?!.*\bUSING (COVERING )?INDEX\b)"),
+    "postgresql" : re.compile(r"\bSeq Scan on\b"),
+}
+
+class Command(BaseCommand):
+    help = "Check hot lookups are served by indexes and keep their number of queries, fail on regressions"
+
+    def get_hot_queries(self) -> list[tuple[str, object]]:
+        """
+        Querysets of the hot lookups, they must not scan whole tables
+        """
+        return [
+            ("routing", PipelineDefinition.objects.filter(event="audit", enabled=True)),
+            ("plans", PipelineDefinitionTaskDefinition.objects.filter(pipeline_definition_id=0, enabled=True).order_by("order", "pk")),
+            ("pipeline tasks", Task.objects.filter(pipeline_id=0, status__in=[0, 3])),
+            ("pipeline artifacts", PipelineArtifact.objects.filter(pipeline_id=0).order_by("pk")),
+            ("admin pipelines", Pipeline.objects.order_by("-start_ts", "-pk")),
+            ("admin pipelines by status", Pipeline.objects.filter(status=2).order_by("-start_ts", "-pk")),
+            ("definition limits", Pipeline.objects.filter(definition_id=0, status__in=[0, 3])),
+            ("retention", Pipeline.objects.filter(definition_id=0, status=1, start_ts__lt=timezone.now())),
+            ("artifact checksum", Artifact.objects.filter(algorithm="audit", checksum="audit")),
+            ("artifact prefix", Artifact.objects.filter(size=0, prefix="")),
+            ("schedules sync", EventSchedule.objects.filter(version__gt=0)),
+        ]
+
+    def get_query_budgets(self) -> list[tuple[str, int, object]]:
+        """
+        Hot code paths and their maximum number of queries
+        """
+        return [
+            ("routing index build", 1, RoutingIndex().build),
+            ("pipeline plan build", 1, lambda: PipelinePlans().get(PipelineDefinition(pk=0))),
+            ("pipeline artifacts", 1, lambda: len(PipelineArtifact.get_artifacts(Pipeline(pk=0)))),
+            ("limited definitions build", 1, LimitedDefinitions().build),
+            ("schedules version", 1, EventScheduleVersion.current),
+        ]
+
+    def explain(self, queryset: object) -> str:
+        """
+        Get the query plan of a queryset, forbidding sequential scans where the planner allows it
+        """
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # tiny tables are always scanned otherwise
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            return queryset.explain()
+
+    def handle(self, *args, **options):
+        failures = []
+        pattern  = SCAN_PATTERNS.get(connection.vendor)
+
+        if pattern is None:
+            self.stdout.write(self.style.WARNING("EXPLAIN audit not supported on %s, skipped" % connection.vendor))
+        else:
+            for name, queryset in self.get_hot_queries():
+                plan  = self.explain(queryset)
+                scans = [line.strip() for line in plan.splitlines() if pattern.search(line)]
+
+                if scans:
+                    failures.append("%s: %s" % (name, "; ".join(scans)))
+                    self.stdout.write(self.style.ERROR("SCAN  %s" % name))
+                else:
+                    self.stdout.write("OK    %s" % name)
+
+        for name, budget, path in self.get_query_budgets():
+            with CaptureQueriesContext(connection) as queries:
+                path()
+
+            if len(queries) > budget:
+                failures.append("%s: %d queries, expected at most %d" % (name, len(queries), budget))
+                self.stdout.write(self.style.ERROR("%-5d %s" % (len(queries), name)))
+            else:
+                self.stdout.write("%-5d %s" % (len(queries), name))
+
+        if failures:
+            raise CommandError("Hot lookups regressed:\n%s" % "\n".join(failures))
+
+        self.stdout.write(self.style.SUCCESS("All hot lookups use indexes and fit their query budgets"))
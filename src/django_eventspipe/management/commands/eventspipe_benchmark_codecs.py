@@ -0,0 +1,107 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_eventspipe.compression import CODECS, get_compressor, get_decompressor
+
+class Command(BaseCommand):
+    help = "Measure compression ratio and throughput of every available artifact codec, zstd requires zstandard"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            help="Sample file to compress (default: generated JSON scan lines)",
+        )
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=16,
+            help="Size in MiB of the generated sample",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1024 * 1024,
+            help="Bytes compressed and decompressed at once",
+        )
+
+    def get_sample(self, size: int) -> bytes:
+        """
+        Generate `size` bytes of JSON lines looking like scan output
+        """
+        rng   = random.Random(0)
+        lines = []
+        total = 0
+
+        while total < size:
+            line = json.dumps({
+                "host"     : "10.0.%d.%d" % (rng.randrange(256), rng.randrange(256)),
+                "port"     : rng.choice([22, 80, 443, 3306, 5432, 8080]),
+                "state"    : rng.choice(["open", "closed", "filtered"]),
+                "service"  : rng.choice(["ssh", "http", "https", "mysql", "postgresql"]),
+                "banner"   : "Server: nginx/1.%d.%d" % (rng.randrange(30), rng.randrange(10)),
+                "duration" : round(rng.random(), 6),
+            }).encode() + b"\n"
+
+            lines.append(line)
+            total += len(line)
+
+        return b"".join(lines)[:size]
+
+    def measure(self, codec: str, sample: bytes, chunk_size: int) -> tuple[int, float, float]:
+        """
+        Get the compressed size and the compression and decompression times of a sample
+        """
+        start      = time.perf_counter()
+        compressor = get_compressor(codec)
+        compressed = [
+            compressor.compress(sample[i:i + chunk_size])
+            for i in range(0, len(sample), chunk_size)
+        ]
+        compressed.append(compressor.flush())
+        compressed = b"".join(compressed)
+        compress   = time.perf_counter() - start
+
+        start        = time.perf_counter()
+        decompressor = get_decompressor(codec)
+        content      = [
+            decompressor.decompress(compressed[i:i + chunk_size])
+            for i in range(0, len(compressed), chunk_size)
+        ]
+        content.append(decompressor.flush())
+        decompress = time.perf_counter() - start
+
+        if b"".join(content) != sample:
+            raise CommandError("%s round trip altered the sample" % codec)
+
+        return len(compressed), compress, decompress
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            with open(options["file"], "rb") as file:
+                sample = file.read()
+        else:
+            sample = self.get_sample(options["size"] * 1024 * 1024)
+
+        megabytes = len(sample) / (1024 * 1024)
+
+        self.stdout.write("%.1f MiB sample, %d bytes chunks" % (megabytes, options["chunk_size"]))
+        self.stdout.write("%-6s %8s %18s %20s" % ("codec", "ratio", "compress (MiB/s)", "decompress (MiB/s)"))
+
+        for codec in CODECS:
+            if codec == "none":
+                continue
+
+            size, compress, decompress = self.measure(codec, sample, options["chunk_size"])
+
+            self.stdout.write("%-6s %7.1fx %18.1f %20.1f" % (
+                codec,
+                len(sample) / size,
+                megabytes / compress,
+                megabytes / decompress
+            ))
+
+        if "zstd" not in CODECS:
+            self.stdout.write(self.style.WARNING("zstd skipped, zstandard is not installed"))
@@ -0,0 +1,101 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from django_eventspipe.limits import limited_definitions
+from django_eventspipe.models import (
+    Pipeline,
+    PipelineDefinition,
+    PipelineDefinitionTaskDefinition,
+    TaskDefinition
+)
+from django_eventspipe.plans import pipeline_plans
+from django_eventspipe.routing import routing_index
+from django_eventspipe.utils import get_sentinel_user
+
+# event routed to the benchmark definitions
+BENCHMARK_EVENT = "eventspipe_benchmark"
+
+class Command(BaseCommand):
+    help = "Count database round trips per event of Pipeline creation, everything is rolled back and nothing is sent"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--definitions",
+            type=int,
+            default=5,
+            help="PipelineDefinitions matching each event",
+        )
+        parser.add_argument(
+            "--tasks",
+            type=int,
+            default=12,
+            help="Tasks of each PipelineDefinition",
+        )
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=100,
+            help="Events of the batch measure",
+        )
+
+    def invalidate(self) -> None:
+        """
+        Drop cached definitions, their changes are never committed
+        """
+        routing_index.invalidate()
+        pipeline_plans.invalidate()
+        limited_definitions.invalidate()
+
+    def create_definitions(self, definitions: int, tasks: int) -> None:
+        """
+        Create `PipelineDefinition` objects of `tasks` tasks each, routed from `BENCHMARK_EVENT`
+        """
+        task_definition = TaskDefinition.objects.create(function="django_eventspipe.tasks.merge_contexts")
+
+        for _ in range(definitions):
+            definition = PipelineDefinition.objects.create(event=BENCHMARK_EVENT)
+
+            PipelineDefinitionTaskDefinition.objects.bulk_create([
+                PipelineDefinitionTaskDefinition(
+                    pipeline_definition = definition,
+                    task_definition     = task_definition,
+                    order               = order
+                )
+                for order in range(tasks)
+            ])
+
+    def measure(self, path: object) -> int:
+        """
+        Get the number of queries of a code path
+        """
+        with CaptureQueriesContext(connection) as queries:
+            path()
+
+        return len(queries)
+
+    def handle(self, *args, **options):
+        events = options["events"]
+
+        try:
+            with transaction.atomic():
+                user = get_sentinel_user()
+                self.create_definitions(options["definitions"], options["tasks"])
+                self.invalidate()
+
+                # celery chains are published on commit, never reached
+                cold = self.measure(lambda: Pipeline.new_from_event(user, {"name": BENCHMARK_EVENT}))
+                warm = self.measure(lambda: Pipeline.new_from_event(user, {"name": BENCHMARK_EVENT}))
+                batch = self.measure(lambda: Pipeline.new_from_events(
+                    user, [{"name": BENCHMARK_EVENT, "i": i} for i in range(events)]
+                ))
+
+                transaction.set_rollback(True)
+        finally:
+            self.invalidate()
+
+        self.stdout.write("%d definitions of %d tasks per event" % (options["definitions"], options["tasks"]))
+        self.stdout.write("%-34s %10s %12s" % ("path", "queries", "per event"))
+        self.stdout.write("%-34s %10d %12.1f" % ("new_from_event, cold caches", cold, cold))
+        self.stdout.write("%-34s %10d %12.1f" % ("new_from_event", warm, warm))
+        self.stdout.write("%-34s %10d %12.1f" % ("new_from_events, %d events" % events, batch, batch / events))
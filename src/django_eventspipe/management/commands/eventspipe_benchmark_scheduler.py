@@ -0,0 +1,91 @@
+import time
+import tracemalloc
+
+from celery import current_app
+from celery.beat import Scheduler
+from celery.schedules import crontab
+
+from django.core.management.base import BaseCommand
+
+from django_eventspipe.schedulers import DynamicScheduler
+
+class BenchmarkScheduler(DynamicScheduler):
+    """
+    `DynamicScheduler` holding in-memory entries only, never synced with the database
+    """
+    def sync(self) -> None:
+        pass
+
+    def should_sync(self) -> bool:
+        return False
+
+class Command(BaseCommand):
+    help = "Measure idle tick latency and memory of celery's Scheduler and DynamicScheduler, nothing is sent"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000, 100000],
+            help="Numbers of schedule entries (default: 1000 10000 100000)",
+        )
+        parser.add_argument(
+            "--ticks",
+            type=int,
+            default=5,
+            help="Ticks averaged per measure",
+        )
+
+    def get_scheduler(self, cls: type, size: int) -> Scheduler:
+        """
+        Get a scheduler of `size` crontab entries, applying entries does nothing
+        """
+        scheduler = cls(current_app, lazy=True)
+        scheduler.__dict__["producer"] = None
+        scheduler.apply_entry = lambda entry, producer=None: None
+        scheduler.apply_schedules = lambda payloads: None
+
+        scheduler.schedule.clear()
+        for i in range(size):
+            scheduler.schedule["schedule-%d" % i] = scheduler.Entry(
+                name     = "schedule-%d" % i,
+                task     = "django_eventspipe.tasks.__trigger_event_schedule",
+                schedule = crontab(minute=str(i % 60)),
+                app      = current_app
+            )
+
+        return scheduler
+
+    def measure(self, scheduler: Scheduler, ticks: int) -> tuple[float, int]:
+        """
+        Get the average tick time in milliseconds and the peak of allocated memory in bytes
+        """
+        # first tick populates the heap
+        scheduler.tick()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+
+        for _ in range(ticks):
+            scheduler.tick()
+
+        elapsed = (time.perf_counter() - start) / ticks
+        peak    = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return elapsed * 1000, peak
+
+    def handle(self, *args, **options):
+        self.stdout.write("%-18s %10s %12s %12s" % ("scheduler", "entries", "tick (ms)", "peak (KB)"))
+
+        for size in options["sizes"]:
+            for name, cls in (("Scheduler", Scheduler), ("DynamicScheduler", BenchmarkScheduler)):
+                elapsed, peak = self.measure(self.get_scheduler(cls, size), options["ticks"])
+
+                self.stdout.write("%-18s %10d %12.3f %12d" % (
+                    name,
+                    size,
+                    elapsed,
+                    peak // 1024
+                ))
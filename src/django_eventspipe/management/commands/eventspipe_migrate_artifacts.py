@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Length
+
+from django_eventspipe.models import Artifact
+
+class Command(BaseCommand):
+    help = "Move artifacts stored in the database to the artifact storage backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threshold",
+            type=int,
+            default=getattr(settings, "EVENTSPIPE_ARTIFACT_DB_THRESHOLD", 64 * 1024),
+            help="Move artifacts storing at least this many bytes (default: EVENTSPIPE_ARTIFACT_DB_THRESHOLD)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of artifacts loaded at once",
+        )
+
+    def handle(self, *args, **options):
+        pks = list(
+            # compare the stored length, size is the uncompressed one
+            Artifact.objects.annotate(stored=Length("data"))
+            .filter(file="", stored__gte=options["threshold"])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        moved = 0
+
+        for index in range(0, len(pks), options["batch_size"]):
+            for artifact in Artifact.objects.filter(pk__in=pks[index:index + options["batch_size"]]):
+                artifact.store(bytes(artifact.data))
+                artifact.save(update_fields=["file", "data"])
+                moved += 1
+
+            self.stdout.write("%d/%d artifacts moved" % (moved, len(pks)))
+
+        self.stdout.write(self.style.SUCCESS("%d artifacts moved to storage" % moved))
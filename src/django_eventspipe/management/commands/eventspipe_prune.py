@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from django_eventspipe import retention
+
+class Command(BaseCommand):
+    help = "Delete completed pipelines out of their retention policy and unreferenced artifacts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "EVENTSPIPE_RETENTION_DAYS", None),
+            help="Keep completed pipelines for this many days (default: EVENTSPIPE_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--failed-days",
+            type=int,
+            default=getattr(settings, "EVENTSPIPE_RETENTION_FAILED_DAYS", None),
+            help="Keep failed pipelines for at least this many days (default: EVENTSPIPE_RETENTION_FAILED_DAYS)",
+        )
+        parser.add_argument(
+            "--keep-last",
+            type=int,
+            default=getattr(settings, "EVENTSPIPE_RETENTION_KEEP_LAST", 0),
+            help="Always keep the last N pipelines of each definition (default: EVENTSPIPE_RETENTION_KEEP_LAST)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "EVENTSPIPE_RETENTION_BATCH_SIZE", 1000),
+            help="Number of rows deleted at once",
+        )
+
+    def handle(self, *args, **options):
+        pipelines, artifacts = retention.prune(
+            days        = options["days"],
+            failed_days = options["failed_days"],
+            keep_last   = options["keep_last"],
+            batch_size  = options["batch_size"],
+        )
+
+        self.stdout.write(self.style.SUCCESS("%d pipelines and %d artifacts pruned" % (pipelines, artifacts)))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:07
+
+import django_eventspipe.storage
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+
+def set_artifacts_size(apps, schema_editor):
+    Artifact = apps.get_model('django_eventspipe', 'Artifact')
+    Artifact.objects.update(size=Length('data'))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0006_pipelinelog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artifact',
+            name='file',
+            field=models.FileField(blank=True, editable=False, max_length=255, storage=django_eventspipe.storage.get_artifact_storage, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='size',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(set_artifacts_size, migrations.RunPython.noop),
+    ]
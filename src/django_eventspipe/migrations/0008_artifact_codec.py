@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0007_artifact_file_artifact_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artifact',
+            name='codec',
+            field=models.CharField(choices=[('none', 'none'), ('zlib', 'zlib'), ('gzip', 'gzip'), ('lzma', 'lzma'), ('zstd', 'zstd')], default='none', editable=False, max_length=16),
+        ),
+    ]
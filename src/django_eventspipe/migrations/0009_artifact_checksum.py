@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+def copy_md5sum(apps, schema_editor):
+    Artifact = apps.get_model('django_eventspipe', 'Artifact')
+    Artifact.objects.update(checksum=models.F('md5sum'))
+
+
+def restore_md5sum(apps, schema_editor):
+    Artifact = apps.get_model('django_eventspipe', 'Artifact')
+    Artifact.objects.filter(algorithm='md5').update(md5sum=models.F('checksum'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0008_artifact_codec'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artifact',
+            name='algorithm',
+            field=models.CharField(default='md5', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='checksum',
+            field=models.CharField(blank=True, editable=False, max_length=128),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='prefix',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.RunPython(copy_md5sum, restore_md5sum),
+        migrations.RemoveField(
+            model_name='artifact',
+            name='md5sum',
+        ),
+        migrations.AddIndex(
+            model_name='artifact',
+            index=models.Index(fields=['size', 'prefix'], name='artifact_size_prefix_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='artifact',
+            constraint=models.UniqueConstraint(fields=('algorithm', 'checksum'), name='unique_artifact_checksum'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0010_eventscheduleversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineDefinitionBucket',
+            fields=[
+                ('definition', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='django_eventspipe.pipelinedefinition')),
+                ('tokens', models.FloatField(default=0)),
+                ('updated_ts', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='event',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pipelinedefinition',
+            name='max_concurrency',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum queued or running Pipelines, empty for unlimited', null=True),
+        ),
+        migrations.AddField(
+            model_name='pipelinedefinition',
+            name='overflow',
+            field=models.CharField(choices=[('queue', 'queue'), ('drop', 'drop'), ('coalesce', 'coalesce')], default='queue', help_text='Pipelines over the limits are queued until they can start, dropped, or coalesced into a single queued Pipeline', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='pipelinedefinition',
+            name='rate_interval',
+            field=models.PositiveIntegerField(default=60, help_text='Rate interval in seconds'),
+        ),
+        migrations.AddField(
+            model_name='pipelinedefinition',
+            name='rate_limit',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum Pipelines started per rate interval, empty for unlimited', null=True),
+        ),
+        migrations.AlterField(
+            model_name='pipeline',
+            name='status',
+            field=models.IntegerField(choices=[(0, 'running'), (1, 'success'), (2, 'error'), (3, 'queued'), (4, 'throttled')], default=3),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0011_pipelinedefinition_limits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipelinedefinition',
+            name='priority',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Celery priority of this PipelineDefinition\'s Tasks, events can override it with a "priority" key', null=True),
+        ),
+        migrations.AddField(
+            model_name='pipelinedefinition',
+            name='queue',
+            field=models.CharField(blank=True, default='', help_text="Celery queue of this PipelineDefinition's Tasks, empty for default routing", max_length=128),
+        ),
+        migrations.AddField(
+            model_name='pipelinedefinitiontaskdefinition',
+            name='priority',
+            field=models.PositiveSmallIntegerField(blank=True, help_text="Celery priority of this Task, empty for the PipelineDefinition's priority", null=True),
+        ),
+        migrations.AddField(
+            model_name='pipelinedefinitiontaskdefinition',
+            name='queue',
+            field=models.CharField(blank=True, default='', help_text="Celery queue of this Task, empty for the PipelineDefinition's queue", max_length=128),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0012_queue_priority'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipelinedefinition',
+            name='retention_days',
+            field=models.PositiveIntegerField(blank=True, help_text='Days completed Pipelines are kept, empty for EVENTSPIPE_RETENTION_DAYS', null=True),
+        ),
+    ]
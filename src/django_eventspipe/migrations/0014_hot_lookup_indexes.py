@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0013_pipelinedefinition_retention_days'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pipeline',
+            index=models.Index(fields=['start_ts'], name='pipeline_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pipeline',
+            index=models.Index(fields=['status', 'start_ts'], name='pipeline_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pipeline',
+            index=models.Index(fields=['definition', 'status', 'start_ts'], name='pipeline_definition_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pipelinedefinition',
+            index=models.Index(condition=models.Q(('enabled', True)), fields=['event'], name='pipelinedef_enabled_event_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pipelinedefinitiontaskdefinition',
+            index=models.Index(condition=models.Q(('enabled', True)), fields=['pipeline_definition', 'order'], name='pdtd_enabled_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['pipeline', 'status'], name='task_pipeline_status_idx'),
+        ),
+    ]
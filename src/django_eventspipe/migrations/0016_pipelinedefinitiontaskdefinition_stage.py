@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0015_task_celery_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipelinedefinitiontaskdefinition',
+            name='stage',
+            field=models.PositiveIntegerField(blank=True, help_text='Consecutive Tasks sharing a stage run in parallel, empty to run this Task on its own', null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:10
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_eventspipe', '0016_pipelinedefinitiontaskdefinition_stage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pipelinedefinition',
+            name='rate_interval',
+            field=models.PositiveIntegerField(default=60, help_text='Rate interval in seconds', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AlterField(
+            model_name='pipelinedefinition',
+            name='rate_limit',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum Pipelines started per rate interval, empty for unlimited', null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
@@ -5,4 +5,7 @@ from .pipeline_definition_task_definition import PipelineDefinitionTaskDefinitio
 from .pipeline import Pipeline
 from .task import Task
 from .pipeline_artifact import PipelineArtifact
+from .pipeline_log import PipelineLog
 from .event_schedule import EventSchedule
+from .event_schedule_version import EventScheduleVersion
+from .pipeline_definition_bucket import PipelineDefinitionBucket
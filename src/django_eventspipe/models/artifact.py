@@ -1,26 +1,271 @@
+import io
 import hashlib
-from django.db import models
+import tempfile
+
+from contextlib import ExitStack
+from typing import BinaryIO, Iterable, Iterator
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import models, transaction
+from django.db.models.functions import Substr
+
+from django_eventspipe.compression import CODEC_CHOICES, get_compressor, get_decompressor
+from django_eventspipe.storage import get_artifact_storage, get_artifact_path, iter_bytes, ChunksReader
+
+# Bytes hashed for the size and prefix pre-check
+PREFIX_SIZE = 4096
+
+def decompress_spool(spool: BinaryIO, codec: str, threshold: int) -> tempfile.SpooledTemporaryFile:
+    """
+    Get a new spooled file holding the decompressed content of a compressed spooled file
+    """
+    decompressor = get_decompressor(codec)
+    content      = tempfile.SpooledTemporaryFile(max_size=threshold)
+
+    spool.seek(0)
+    for chunk in iter(lambda: spool.read(PREFIX_SIZE * 16), b""):
+        content.write(decompressor.decompress(chunk))
+    content.write(decompressor.flush())
+
+    return content
 
 class Artifact(models.Model):
     data       = models.BinaryField(blank=True)
-    md5sum     = models.CharField(max_length=32, blank=True, editable=False, unique=True)  # Unique MD5 checksum
+    file       = models.FileField(storage=get_artifact_storage, max_length=255, blank=True, editable=False)
+    size       = models.BigIntegerField(default=0, editable=False)  # Uncompressed size in bytes
+    codec      = models.CharField(max_length=16, default="none", choices=CODEC_CHOICES, editable=False)
+    algorithm  = models.CharField(max_length=16, default="md5", editable=False)
+    checksum   = models.CharField(max_length=128, blank=True, editable=False)
+    prefix     = models.CharField(max_length=16, blank=True, editable=False)  # Checksum of the first bytes
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["algorithm", "checksum"], name="unique_artifact_checksum"),
+        ]
+        indexes = [
+            models.Index(fields=["size", "prefix"], name="artifact_size_prefix_idx"),
+        ]
 
     @classmethod
-    def get_or_create(cls, data:bytes) -> object:
-        # Compute the MD5 checksum of the data
-        md5sum = hashlib.md5(data).hexdigest()
+    def get_or_create(cls, data: bytes | BinaryIO | Iterable[bytes]) -> object:
+        """
+        Store a file from bytes, a file-like object or an iterator of bytes.
+        Content is hashed and compressed while spooled, kept as is when compression doesn't make it smaller,
+        and deduplicated with a single insert-or-fetch query on its checksum.
+        Files bigger than `EVENTSPIPE_ARTIFACT_DB_THRESHOLD` are first looked up
+        by size and prefix checksum, skipping storage writes for known files
+        and storage lookups for unique ones.
+        Within a transaction, the returned file stays locked against `prune_artifacts`
+        until the transaction references it.
+        """
+        threshold = getattr(settings, "EVENTSPIPE_ARTIFACT_DB_THRESHOLD", 64 * 1024)
+        codec     = getattr(settings, "EVENTSPIPE_ARTIFACT_CODEC", "gzip")
+        minimum   = getattr(settings, "EVENTSPIPE_ARTIFACT_COMPRESSION_THRESHOLD", 1024)
+        algorithm = getattr(settings, "EVENTSPIPE_ARTIFACT_HASH", "blake2b")
+        checksum  = hashlib.new(algorithm)
+        prefix    = hashlib.blake2b(digest_size=8)
+        size      = 0
+
+        # Content is kept as is until it reaches the compression threshold
+        compressor = None
+        head       = b""
+
+        with ExitStack() as stack:
+            spool = stack.enter_context(tempfile.SpooledTemporaryFile(max_size=threshold))
+
+            for chunk in iter_bytes(data):
+                checksum.update(chunk)
+
+                if size < PREFIX_SIZE:
+                    prefix.update(chunk[:PREFIX_SIZE - size])
+
+                size += len(chunk)
 
-        if cls.objects.filter(md5sum=md5sum).exists():
-            return cls.objects.get(md5sum=md5sum)
+                if compressor is not None:
+                    spool.write(compressor.compress(chunk))
+                    continue
 
-        file = cls(data=data,md5sum=md5sum)
-        file.save()
+                if codec == "none":
+                    spool.write(chunk)
+                    continue
+
+                head += chunk
+
+                if size >= minimum:
+                    compressor = get_compressor(codec)
+                    spool.write(compressor.compress(head))
+                    head = b""
+
+            if compressor is not None:
+                spool.write(compressor.flush())
+
+                if spool.tell() >= size:
+                    # Compression doesn't pay off, keep the content as is
+                    compressor = None
+                    spool      = stack.enter_context(decompress_spool(spool, codec, threshold))
+            else:
+                spool.write(head)
+
+            file = cls(
+                size      = size, 
+                algorithm = algorithm,
+                checksum  = checksum.hexdigest(), 
+                prefix    = prefix.hexdigest(),
+                codec     = codec if compressor is not None else "none"
+            )
+
+            if spool.tell() >= threshold:
+                # Big files go to the storage backend, unless already known
+                known = cls.objects.filter(size=file.size, prefix=file.prefix).exists()
+
+                if known:
+                    # locked like upserted files, until the caller's transaction references it
+                    with transaction.atomic():
+                        existing = cls.objects.select_for_update().defer("data").filter(
+                            algorithm = file.algorithm, 
+                            checksum  = file.checksum
+                        ).first()
+
+                    if existing is not None:
+                        return existing
+
+                spool.seek(0)
+                file.store(File(spool), exists=None if known else False)
+            else:
+                spool.seek(0)
+                file.data = spool.read()
+
+            # Insert, or fetch the pk of the existing file with the same checksum
+            cls.objects.bulk_create(
+                [file], 
+                update_conflicts = True, 
+                unique_fields    = ["algorithm", "checksum"], 
+                update_fields    = ["checksum"]
+            )
+
+        if file.pk is None:
+            # database can't return pks from bulk inserts
+            file = cls.objects.defer("data").get(algorithm=file.algorithm, checksum=file.checksum)
 
         return file
-        
-    @property
-    def size(self) -> float:
+
+    def store(self, content: bytes | File, exists: bool | None = None) -> None:
+        """
+        Write this file's stored content on the storage backend.
+        `exists` skips the storage lookup when already known.
+        """
+        storage = self.file.storage
+        name    = get_artifact_path(self.checksum)
+
+        if self.codec != "none":
+            name = "%s.%s" % (name, self.codec)
+
+        if exists is None:
+            exists = storage.exists(name)
+
+        # Files are content-addressed, an existing file has the same content
+        if not exists:
+            saved = storage.save(name, content if isinstance(content, File) else ContentFile(content))
+
+            if saved != name:
+                # Stored concurrently under the same name, drop the suffixed duplicate
+                storage.delete(saved)
+
+        self.file.name = name
+        self.data = b""
+
+    def read(self) -> bytes:
+        """
+        Get the whole content of a file
+        """
+        return b"".join(self.iter_chunks())
+
+    def open(self) -> io.BufferedReader:
+        """
+        Get a streaming, read-only file-like object on a file
+        """
+        return io.BufferedReader(ChunksReader(self.iter_chunks()))
+
+    def iter_stored_chunks(self, start: int = 0, end: int | None = None, chunk_size: int | None = None) -> Iterator[bytes]:
+        """
+        Read this file's stored (possibly compressed) content by chunks 
+        from `start` to `end` (inclusive) bytes, without loading it at once
+        """
+        chunk_size = chunk_size or getattr(settings, "EVENTSPIPE_ARTIFACT_CHUNK_SIZE", 1024 * 1024)
+        position   = start
+
+        if self.file:
+            # Read from the storage backend
+            with self.file.storage.open(self.file.name, "rb") as file:
+                file.seek(start)
+
+                while end is None or position <= end:
+                    chunk = file.read(chunk_size if end is None else min(chunk_size, end + 1 - position))
+                    if not chunk:
+                        break
+
+                    position += len(chunk)
+                    yield chunk
+
+            return
+
+        if "data" not in self.get_deferred_fields():
+            # data is already loaded
+            data = memoryview(self.data)[:None if end is None else end + 1]
+
+            for position in range(start, len(data), chunk_size):
+                yield bytes(data[position:position + chunk_size])
+
+            return
+
+        while end is None or position <= end:
+            chunk = bytes(
+                self.__class__.objects.filter(pk=self.pk).values_list(
+                    Substr(
+                        "data", 
+                        position + 1, 
+                        chunk_size if end is None else min(chunk_size, end + 1 - position), 
+                        output_field=models.BinaryField()
+                    ),
+                    flat=True
+                ).get() or b""
+            )
+            if not chunk:
+                break
+
+            position += len(chunk)
+            yield chunk
+
+    def iter_chunks(self, start: int = 0, end: int | None = None, chunk_size: int | None = None) -> Iterator[bytes]:
         """
-        Get size in KB of a file
+        Read a file by chunks from `start` to `end` (inclusive) bytes,
+        decompressing it on the fly, without loading it at once.
+        Compressed files can't be seeked: their content is decompressed from the first byte,
+        reading a range costs as much as reading the file up to `end`.
         """
-        return len(self.data) / 1000
+        if self.codec == "none":
+            yield from self.iter_stored_chunks(start, end, chunk_size)
+            return
+
+        if end is None:
+            end = self.size - 1
+
+        decompressor = get_decompressor(self.codec)
+        position     = 0
+
+        for chunk in self.iter_stored_chunks(chunk_size=chunk_size):
+            chunk = decompressor.decompress(chunk)
+
+            # Skip content before start, stop after end
+            if chunk and position + len(chunk) > start:
+                yield chunk[max(start - position, 0):end + 1 - position]
+
+            position += len(chunk)
+
+            if position > end:
+                return
+
+        chunk = decompressor.flush()
+        if chunk and position <= end:
+            yield chunk[max(start - position, 0):end + 1 - position]
@@ -1,6 +1,5 @@
-import hashlib
-
-from django.db import models
+from django.apps import apps
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils.timezone import get_current_timezone
 
@@ -8,6 +7,7 @@ from celery import schedules
 from celery.beat import ScheduleEntry
 
 from django_eventspipe import validators
+from django_eventspipe.cron import CronExpression, get_cron, get_cron_key
 from django_eventspipe.utils import cronexp, get_sentinel_user
 
 class EventSchedule(models.Model):
@@ -54,18 +54,7 @@ class EventSchedule(models.Model):
         help_text    = 'Cron Days Of The Week to Run. Use "*" for "all", Sunday is 0 or 7, Monday is 1. (Example: "0,5")',
         validators   = [validators.day_of_week_validator],
     )
-
-    @classmethod
-    def compute_hash(cls) -> str:
-        """
-        Compute a hash of the enabled schedules to detect changes.
-        """
-        schedules = cls.objects.filter(enabled=True)
-        schedule_str = ''.join(
-            f"{s.pk}-{s.__str__}" 
-            for s in schedules
-        )
-        return hashlib.md5(schedule_str.encode()).hexdigest()
+    version = models.BigIntegerField(default=0, editable=False, db_index=True)  # `EventScheduleVersion` of the last change
 
     def __str__(self) -> str:
         return '{} {} {} {} {} ({})'.format(
@@ -74,6 +63,20 @@ class EventSchedule(models.Model):
             cronexp(self.day_of_week), str(get_current_timezone())
         )
 
+    def save(self, *args, **kwargs) -> None:
+        """
+        Save an EventSchedule stamped with a new schedules version, within the transaction bumping it.
+        `QuerySet.update()` and `bulk_create()` bypass this, schedulers never see such changes.
+        """
+        EventScheduleVersion = apps.get_model("django_eventspipe.EventScheduleVersion")
+
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+
+        with transaction.atomic():
+            self.version = EventScheduleVersion.bump()
+            super().save(*args, **kwargs)
+
     @property
     def entry_name(self) -> str:
         """
@@ -93,16 +96,22 @@ class EventSchedule(models.Model):
             args     = [self.pk],
         )
 
+    @property
+    def cron(self) -> CronExpression:
+        """
+        Get the shared parsed cron expression of an EventSchedule object
+        """
+        return get_cron(get_cron_key(
+            self.minute,
+            self.hour,
+            self.day_of_month,
+            self.month_of_year,
+            self.day_of_week,
+        ))
+
     @property
     def schedule(self) -> schedules.crontab:
         """
         Get crontab schedules for an EventSchedule object
         """
-        crontab = schedules.crontab(
-            minute        = self.minute,
-            hour          = self.hour,
-            day_of_week   = self.day_of_week,
-            day_of_month  = self.day_of_month,
-            month_of_year = self.month_of_year,
-        )
-        return crontab
+        return self.cron.schedule
@@ -0,0 +1,28 @@
+from django.db import models, transaction
+from django.db.models import F
+
+class EventScheduleVersion(models.Model):
+    """
+    Counter increased on every `EventSchedule` change made through `save()` or `delete()`
+    """
+    version = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls) -> int:
+        """
+        Get the current schedules version
+        """
+        return cls.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls) -> int:
+        """
+        Increase the schedules version, the counter row stays locked 
+        until the current transaction commits so versions are committed in order.
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(pk=1).update(version=F("version") + 1):
+                cls.objects.get_or_create(pk=1)
+                cls.objects.filter(pk=1).update(version=F("version") + 1)
+
+            return cls.current()
@@ -1,13 +1,22 @@
+import logging
 import platform
 
+from collections.abc import Mapping
+from typing import BinaryIO, Iterable
+
+from celery import chain, current_app
+
 from django.apps import apps
+from django.conf import settings
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.contrib.admin.models import LogEntry, ADDITION
-from django.contrib.contenttypes.models import ContentType
 
-from django_eventspipe.utils import get_sentinel_user
+from django_eventspipe import dedupe, limits
+from django_eventspipe.logs import LogBuffer, get_log_sink
+from django_eventspipe.utils import get_sentinel_user, bulk_save
+
+logger = logging.getLogger(__name__)
 
 class Pipeline(models.Model):
     
@@ -15,7 +24,8 @@ class Pipeline(models.Model):
         (0, "running"),
         (1, "success"),
         (2, "error"),
-        (3, "queued")
+        (3, "queued"),
+        (4, "throttled")
     ]
 
     node         = models.CharField(max_length=256, default="undefined")
@@ -27,6 +37,17 @@ class Pipeline(models.Model):
     start_ts     = models.DateTimeField(auto_now_add=True)
     end_ts       = models.DateTimeField(blank=True, null=True)
     user         = models.ForeignKey(User, on_delete=models.SET(get_sentinel_user))
+    event        = models.JSONField(blank=True, null=True) # event of a throttled Pipeline, until it starts
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["start_ts"], name="pipeline_start_idx"),
+            models.Index(fields=["status", "start_ts"], name="pipeline_status_start_idx"),
+            models.Index(fields=["definition", "status", "start_ts"], name="pipeline_definition_status_idx"),
+        ]
+
+    _log_task   = None
+    _log_buffer = None
 
     @classmethod
     def new_from_event(
@@ -40,38 +61,260 @@ class Pipeline(models.Model):
         Filtered `PipelineDefinition` objects always have priority over generic ones,
         this allow replacing definitions only when required. 
         """
-        PipelineDefinition = apps.get_model("django_eventspipe.PipelineDefinition")
+        pipelines = cls.new_from_events(user, [event])
 
-        # Check for available info for this event
-        if "info" in event.keys():
-            pipeline_name = "%s %s" % (event["name"], event["info"])
-        else:
-            pipeline_name = event["name"]
+        if len(pipelines) <= 0:
+            # no such pipeline definition
+            return False
+
+        return pipelines
+
+    @classmethod
+    def new_from_events(
+        cls,
+        user: User,
+        events: list[dict[str, object]]
+    ) -> list[object]:
+        """
+        Create and execute `Pipeline` objects from many events at once.
+        `Pipeline` and `Task` objects are inserted in bulk and celery chains
+        are published with a single producer once the transaction commits.
+        Events sharing a dedupe key within the dedupe window are dropped.
+        """
+        # Drop duplicated events before routing them
+        events, dedupe_keys = dedupe.deduplicate(events)
+
+        try:
+            return cls._new_from_events(user, events)
+        except Exception:
+            # Let a redelivery of these events go through
+            dedupe.release(dedupe_keys)
+            raise
+
+    @classmethod
+    def _new_from_events(
+        cls,
+        user: User,
+        events: list[dict[str, object]]
+    ) -> list[object]:
+        """
+        Create and execute `Pipeline` objects from unique events
+        """
+        PipelineDefinition = apps.get_model("django_eventspipe.PipelineDefinition")
+        Task = apps.get_model("django_eventspipe.Task")
 
         # Create the pipeline objects
-        pipelines   = []
-        definitions = PipelineDefinition.get_definitions(event)
+        pipelines       = []
+        pipeline_events = []
+        pipeline_tasks  = []
+        defined_tasks   = {}
+        node            = platform.node()
+
+        for event in events:
+            # Check for available info for this event
+            if "info" in event.keys():
+                pipeline_name = "%s %s" % (event["name"], event["info"])
+            else:
+                pipeline_name = event["name"]
+
+            for definition in PipelineDefinition.get_definitions(event):
+                # Get Task definitions once per PipelineDefinition
+                if definition.pk not in defined_tasks:
+                    defined_tasks[definition.pk] = definition.defined_tasks
+
+                pipeline = cls(
+                    name=pipeline_name, 
+                    user=user, 
+                    node=node,
+                    definition=definition,
+                    tasks_count=len(defined_tasks[definition.pk])
+                )
+
+                if pipeline.tasks_count <= 0:
+                    # No Tasks defined for this pipeline, it's already completed
+                    pipeline.status = 1
+                    pipeline.end_ts = timezone.now()
+
+                pipelines.append(pipeline)
+                pipeline_events.append(event)
+
+        if len(pipelines) <= 0:
+            return pipelines
+
+        with transaction.atomic():
+            # Apply PipelineDefinition limits
+            pipelines, pipeline_events = cls.throttle(pipelines, pipeline_events)
+
+            bulk_save(cls, pipelines)
+
+            # Create all the Tasks at once
+            for pipeline in pipelines:
+                pipeline_tasks.append(Task.new_tasks(pipeline, defined_tasks[pipeline.definition.pk]))
+
+            bulk_save(Task, [task for tasks in pipeline_tasks for task in tasks])
+
+            get_log_sink().write([
+                pipeline.new_log("Event received %s" % str(event))
+                for pipeline, event in zip(pipelines, pipeline_events)
+            ] + [
+                pipeline.new_log("Throttled by PipelineDefinition limits")
+                for pipeline in pipelines
+                if pipeline.status == 4
+            ])
+
+            # Run Pipelines once the Tasks are committed
+            chains = [
+                pipeline.definition.get_tasks_chain(pipeline.get_context(event), tasks, pipeline.get_priority(event))
+                for pipeline, event, tasks in zip(pipelines, pipeline_events, pipeline_tasks)
+                if pipeline.tasks_count > 0 and pipeline.status == 3
+            ]
+            transaction.on_commit(lambda: cls.publish(chains))
 
-        if len(definitions) <= 0:
-            # no such pipeline definition
-            return False
+        return pipelines
+
+    @classmethod
+    def throttle(
+        cls,
+        pipelines: list[object],
+        events: list[dict[str, object]]
+    ) -> tuple[list[object], list[dict[str, object]]]:
+        """
+        Apply `PipelineDefinition` limits to new `Pipeline` objects, within the transaction starting them.
+        Pipelines over the limits are throttled until they can start, dropped, 
+        or coalesced into a single throttled Pipeline, following their definition's overflow policy.
+        Return the Pipelines to keep and their events.
+        """
+        limited = {}
+
+        for pipeline, event in zip(pipelines, events):
+            if pipeline.tasks_count > 0 and pipeline.definition.is_limited:
+                limited.setdefault(pipeline.definition.pk, []).append((pipeline, event))
+
+        if not limited:
+            return pipelines, events
+
+        dropped = set()
+
+        for items in limited.values():
+            definition = items[0][0].definition
+            exclude    = [pipeline.pk for pipeline, event in items if pipeline.pk is not None]
+
+            limits.lock(definition)
+
+            # Throttled Pipelines start first
+            pending = definition.overflow != "drop" and cls.objects.filter(
+                definition = definition, 
+                status     = 4
+            ).exclude(pk__in=exclude).exists()
+
+            if pending:
+                admitted, retry_after = 0, None
+            else:
+                admitted, retry_after = limits.admit(definition, len(items), exclude)
+
+            overflow = items[admitted:]
+            held     = []
+
+            if definition.overflow == "drop":
+                dropped.update(id(pipeline) for pipeline, event in overflow)
+
+            elif definition.overflow == "coalesce":
+                held = overflow[:0 if pending else 1]
+                dropped.update(id(pipeline) for pipeline, event in overflow[len(held):])
+
+            else:
+                held = overflow
+
+            for pipeline, event in held:
+                pipeline.status = 4
+                pipeline.event  = event
+
+            if overflow:
+                logger.info(
+                    "PipelineDefinition #%d limits reached, %d pipelines throttled, %d dropped" 
+                    % (definition.pk, len(held), len(overflow) - len(held))
+                )
+
+            if held and definition.rate_limit is not None:
+                limits.schedule_release(definition.pk, retry_after or definition.rate_interval / max(definition.rate_limit, 1))
+
+        if not dropped:
+            return pipelines, events
+
+        kept = [
+            (pipeline, event) 
+            for pipeline, event in zip(pipelines, events) 
+            if id(pipeline) not in dropped
+        ]
+
+        return [pipeline for pipeline, event in kept], [event for pipeline, event in kept]
+
+    @classmethod
+    def release(cls, definition: object) -> list[object]:
+        """
+        Start throttled `Pipeline` objects of a `PipelineDefinition`, as far as its limits allow
+        """
+        Task = apps.get_model("django_eventspipe.Task")
+
+        batch_size = min(
+            limit for limit in (
+                definition.max_concurrency, 
+                definition.rate_limit, 
+                getattr(settings, "EVENTSPIPE_RELEASE_BATCH_SIZE", 1000)
+            ) 
+            if limit is not None
+        )
+
+        with transaction.atomic():
+            limits.lock(definition)
 
-        for definition in definitions:
-            # Create Pipeline object
-            pipeline = cls(
-                name=pipeline_name, 
-                user=user, 
-                node=platform.node(),
-                definition=definition
-            )
-            pipeline.save()
+            pending = list(cls.objects.filter(
+                definition = definition, 
+                status     = 4
+            ).order_by("pk").values_list("pk", flat=True)[:batch_size])
 
-            # Run Pipeline
-            pipeline.execute(event)
-            pipelines.append(pipeline)
+            if not pending:
+                return []
+
+            admitted, retry_after = limits.admit(definition, len(pending))
+
+            pipelines = list(cls.objects.filter(pk__in=pending[:admitted]).order_by("pk"))
+
+            if pipelines:
+                cls.objects.filter(pk__in=pending[:admitted]).update(status=3, event=None)
+
+                pipeline_tasks = {}
+                for task in Task.objects.filter(pipeline__in=pending[:admitted]):
+                    pipeline_tasks.setdefault(task.pipeline_id, []).append(task)
+
+                chains = []
+                for pipeline in pipelines:
+                    pipeline.definition = definition
+                    chains.append(definition.get_tasks_chain(
+                        pipeline.get_context(pipeline.event), 
+                        pipeline_tasks.get(pipeline.pk, []),
+                        pipeline.get_priority(pipeline.event)
+                    ))
+                    pipeline.status = 3
+                    pipeline.event  = None
+
+                transaction.on_commit(lambda: cls.publish(chains))
+
+            # More throttled Pipelines are waiting for the rate limit
+            if retry_after is not None and (admitted < len(pending) or len(pending) >= batch_size):
+                limits.schedule_release(definition.pk, retry_after)
 
         return pipelines
 
+    @staticmethod
+    def publish(chains: list[chain]) -> None:
+        """
+        Publish celery chains sharing a single broker connection
+        """
+        with current_app.producer_or_acquire() as producer:
+            for pipeline_chain in chains:
+                pipeline_chain.apply_async(producer=producer)
+
     @property
     def __task_progress_str(self) -> str:
         if self.tasks_count > 0:
@@ -80,9 +323,9 @@ class Pipeline(models.Model):
             return ""
 
     @property
-    def artifacts(self) -> dict[str, object]:
+    def artifacts(self) -> Mapping[str, bytes]:
         """
-        Get stored artifacts for this Pipeline
+        Get stored artifacts for this Pipeline, as a lazy read-only mapping
         """
         PipelineArtifact = apps.get_model("django_eventspipe.PipelineArtifact")
 
@@ -91,9 +334,10 @@ class Pipeline(models.Model):
     def __str__(self) -> str:
         return "Pipeline #%d" % self.pk
 
-    def save_artifact(self, file_name: str, file_data: bytes) -> bool:
+    def save_artifact(self, file_name: str, file_data: bytes | BinaryIO | Iterable[bytes]) -> bool:
         """
-        Save an artifact for this Pipeline
+        Save an artifact for this Pipeline, 
+        from bytes, a file-like object or an iterator of bytes
         """
         PipelineArtifact = apps.get_model("django_eventspipe.PipelineArtifact")
 
@@ -103,16 +347,26 @@ class Pipeline(models.Model):
             file_data = file_data,
         )
 
-    def execute(self, event: dict[str, object]) -> None:
-        """ 
-        Execute a `Pipeline`
+    @staticmethod
+    def get_priority(event: dict[str, object]) -> int | None:
         """
-        Task = apps.get_model("django_eventspipe.Task")
+        Get the priority of an event, an invalid priority is ignored
+        """
+        priority = event.get("priority")
 
-        # add initial pipeline's log entry
-        self.log("Event received %s" % str(event))
+        if priority is None:
+            return None
 
-        # Get initial context from event
+        try:
+            return int(priority)
+        except (TypeError, ValueError):
+            logger.warning("ignoring invalid priority '%s' of event '%s'" % (priority, str(event)))
+            return None
+
+    def get_context(self, event: dict[str, object]) -> dict[str, object]:
+        """
+        Get initial context for this `Pipeline` from an event
+        """
         context = {
             "pipeline" : self.pk
         }
@@ -122,47 +376,103 @@ class Pipeline(models.Model):
             context[data] = event[data]
 
         # retrive context data from PipelineDefinitinon's options
-        for data in self.definition.options.keys():
+        for data in (self.definition.options or {}).keys():
             context[data] = self.definition.options[data]
 
-        # Get Task definition for this event on this perimeter
-        pipeline_tasks   = Task.create_tasks(self)
+        return context
 
-        # No Tasks defined for this pipeline, exit
-        if len(pipeline_tasks) <= 0:
-            self.status = 1
-            self.tasks_count = 0
-            self.current_task = 0
-            self.end_ts = timezone.now()
-            self.save()
+    def dispatch(self, event: dict[str, object], tasks: list[object]) -> None:
+        """
+        Start the celery chain for this `Pipeline` when the current transaction commits
+        """
+        pipeline_chain = self.definition.get_tasks_chain(self.get_context(event), tasks, self.get_priority(event))
+        transaction.on_commit(pipeline_chain.apply_async)
 
-            return None
+    def execute(self, event: dict[str, object]) -> None:
+        """ 
+        Execute a `Pipeline`
+        """
+        Task = apps.get_model("django_eventspipe.Task")
+
+        # add initial pipeline's log entry
+        self.log("Event received %s" % str(event))
+
+        with transaction.atomic():
+            # Get Task definition for this event on this perimeter
+            pipeline_tasks = Task.create_tasks(self)
+
+            # No Tasks defined for this pipeline, exit
+            if len(pipeline_tasks) <= 0:
+                self.status = 1
+                self.tasks_count = 0
+                self.current_task = 0
+                self.end_ts = timezone.now()
+                self.save(update_fields=["status", "tasks_count", "current_task", "end_ts"])
+
+                return None
+
+            # Set pipeline as queued
+            self.status      = 3
+            self.tasks_count = len(pipeline_tasks)
+
+            # Apply PipelineDefinition limits
+            if not self.throttle([self], [event])[0]:
+                self.log("Dropped by PipelineDefinition limits")
+                self.fail()
+
+                return None
+
+            self.save(update_fields=["status", "tasks_count", "event"])
 
-        # Set pipeline as queued
-        self.status      = 3
-        self.tasks_count = len(pipeline_tasks)
-        self.save()
+            if self.status == 4:
+                self.log("Throttled by PipelineDefinition limits")
 
-        # Get and start celery chain for this pipeline
-        pipeline_chain = self.definition.get_tasks_chain(context) 
-        pipeline_chain.apply_async()
+                return None
+
+            # Get and start celery chain for this pipeline
+            self.dispatch(event, pipeline_tasks)
 
     def log(self, entry: str) -> None:
         """
-        Add a LogEntry on a `Pipeline`
+        Add a `PipelineLog` on a `Pipeline`, 
+        buffered while a `Task` is running.
         """
-        log_entry = "%s%s" % (self.__task_progress_str, entry)
+        log_entry = self.new_log(entry)
+
+        if self._log_buffer is not None:
+            self._log_buffer.write(log_entry)
+        else:
+            get_log_sink().write([log_entry])
 
-        # Add an ADDITION logentry for this asset
-        LogEntry.objects.log_action(
-            user_id=self.user.pk,
-            content_type_id=ContentType.objects.get_for_model(Pipeline).pk,
-            object_id=self.id,
-            object_repr="Pipeline #%d" % self.id,
-            action_flag=ADDITION,
-            change_message=log_entry
+    def new_log(self, entry: str) -> object:
+        """
+        Get an unsaved `PipelineLog` for this `Pipeline`
+        """
+        PipelineLog = apps.get_model("django_eventspipe.PipelineLog")
+
+        return PipelineLog(
+            pipeline = self,
+            task_id  = self._log_task,
+            message  = "%s%s" % (self.__task_progress_str, entry)
         )
 
+    def start_log_buffer(self, task: int | None = None) -> None:
+        """
+        Buffer this `Pipeline`'s logs until `flush_logs` is called
+        """
+        self._log_task   = task
+        self._log_buffer = LogBuffer()
+
+    def flush_logs(self) -> None:
+        """
+        Write buffered logs and stop buffering
+        """
+        if self._log_buffer is not None:
+            self._log_buffer.flush()
+
+        self._log_task   = None
+        self._log_buffer = None
+
     def fail(self) -> None:
         """
         Set a `Pipeline` and his uncompleted `Task` objects as failed.
@@ -172,7 +482,7 @@ class Pipeline(models.Model):
         # Update Pipeline object
         self.status = 2
         self.end_ts = timezone.now()
-        self.save()
+        self.save(update_fields=["status", "end_ts"])
 
         # Update queued Tasks
         Task.pipeline_failed(self)
@@ -1,4 +1,7 @@
-from django.db import models
+from collections.abc import Mapping
+from typing import BinaryIO, Iterable, Iterator
+
+from django.db import models, transaction
 from django.apps import apps
 
 class PipelineArtifact(models.Model):
@@ -11,33 +14,83 @@ class PipelineArtifact(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True, null=True)
 
     @classmethod
-    def add_artifact(cls, pipeline: object, file_name: str, file_data: bytes) -> bool:
+    def add_artifact(cls, pipeline: object, file_name: str, file_data: bytes | BinaryIO | Iterable[bytes]) -> bool:
         """
-        Add a new artifact to the database
+        Add a new artifact to the database, 
+        from bytes, a file-like object or an iterator of bytes
         """
         Artifact = apps.get_model("django_eventspipe.Artifact")
 
-        artifact = Artifact.get_or_create(file_data)
+        # The artifact row stays locked until referenced, unreferenced artifacts are pruned
+        with transaction.atomic():
+            artifact = Artifact.get_or_create(file_data)
 
-        pipeline_artifact = cls(
-            pipeline=pipeline, 
-            artifact=artifact, 
-            file_name=file_name
-        )
-        pipeline_artifact.save()
+            pipeline_artifact = cls(
+                pipeline=pipeline, 
+                artifact=artifact, 
+                file_name=file_name
+            )
+            pipeline_artifact.save()
 
         return True
 
     @classmethod
-    def get_artifacts(cls, pipeline: object) -> dict[str, object]:
+    def get_artifacts(cls, pipeline: object) -> "ArtifactMapping":
         """
         Get stored artifacts for a Pipeline
         """
-        out = {}
-        artifacts = cls.objects.filter(pipeline=pipeline)
+        return ArtifactMapping(pipeline)
+
+class ArtifactMapping(Mapping):
+    """
+    Read-only mapping of a Pipeline's artifacts by file name.
+    Names, sizes and checksums are listed with a single query,
+    files content is fetched only when accessed.
+    """
+
+    def __init__(self, pipeline: object) -> None:
+        self.pipeline   = pipeline
+        self._artifacts = None
+
+    @property
+    def artifacts(self) -> dict[str, object]:
+        if self._artifacts is None:
+            # Latest artifact wins on duplicated file names
+            self._artifacts = {
+                pipeline_artifact.file_name: pipeline_artifact.artifact
+                for pipeline_artifact in PipelineArtifact.objects.filter(
+                    pipeline=self.pipeline
+                ).select_related("artifact").defer("artifact__data").order_by("pk")
+            }
+
+        return self._artifacts
+
+    def __getitem__(self, file_name: str) -> bytes:
+        return self.artifacts[file_name].read()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.artifacts)
 
-        for artifact in artifacts:
-            out[artifact.file_name] = bytes(artifact.artifact.data)
+    def __len__(self) -> int:
+        return len(self.artifacts)
 
-        return out
+    def __contains__(self, file_name: object) -> bool:
+        return file_name in self.artifacts
 
+    def size(self, file_name: str) -> int:
+        """
+        Get size in bytes of an artifact
+        """
+        return self.artifacts[file_name].size
+
+    def checksum(self, file_name: str) -> str:
+        """
+        Get checksum of an artifact, computed with `EVENTSPIPE_ARTIFACT_HASH`
+        """
+        return self.artifacts[file_name].checksum
+
+    def open(self, file_name: str) -> BinaryIO:
+        """
+        Get a streaming, read-only file-like object on an artifact
+        """
+        return self.artifacts[file_name].open()
@@ -1,75 +1,109 @@
 from celery import chain
 
+from django.core.validators import MinValueValidator
 from django.db import models
-from django.apps import apps
-from django.utils.module_loading import import_string
+
+from django_eventspipe.plans import pipeline_plans
+from django_eventspipe.routing import routing_index
 
 class PipelineDefinition(models.Model):
+
+    OVERFLOW_CHOICES = [
+        ("queue", "queue"),
+        ("drop", "drop"),
+        ("coalesce", "coalesce")
+    ]
+
     event     = models.CharField(max_length=256)
     filters   = models.JSONField(blank=True, null=True, default=dict)
     options   = models.JSONField(blank=True, null=True, default=dict)
     enabled   = models.BooleanField(default=True)
 
+    max_concurrency = models.PositiveIntegerField(
+        blank     = True,
+        null      = True,
+        help_text = 'Maximum queued or running Pipelines, empty for unlimited'
+    )
+    rate_limit = models.PositiveIntegerField(
+        blank      = True,
+        null       = True,
+        validators = [MinValueValidator(1)],
+        help_text  = 'Maximum Pipelines started per rate interval, empty for unlimited'
+    )
+    rate_interval = models.PositiveIntegerField(
+        default    = 60,
+        validators = [MinValueValidator(1)],
+        help_text  = 'Rate interval in seconds'
+    )
+    queue = models.CharField(
+        max_length = 128,
+        blank      = True,
+        default    = '',
+        help_text  = 'Celery queue of this PipelineDefinition\'s Tasks, empty for default routing'
+    )
+    priority = models.PositiveSmallIntegerField(
+        blank     = True,
+        null      = True,
+        help_text = 'Celery priority of this PipelineDefinition\'s Tasks, events can override it with a "priority" key'
+    )
+    retention_days = models.PositiveIntegerField(
+        blank     = True,
+        null      = True,
+        help_text = 'Days completed Pipelines are kept, empty for EVENTSPIPE_RETENTION_DAYS'
+    )
+    overflow = models.CharField(
+        max_length = 16,
+        default    = "queue",
+        choices    = OVERFLOW_CHOICES,
+        help_text  = 'Pipelines over the limits are queued until they can start, '
+                     'dropped, or coalesced into a single queued Pipeline'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["event"], condition=models.Q(enabled=True), name="pipelinedef_enabled_event_idx"),
+        ]
+
     @classmethod
     def get_definitions(cls, event: dict[str, object]) -> list[object]:
         """
         Get pipeline definitions for a given event.
+        Filtered definitions always have priority over generic ones.
         """
-        all_definitions = cls.objects.filter(event=event["name"], enabled=True)
+        return routing_index.get_definitions(event)
 
-        # Separate generic and custom definitions
-        generic_definitions = []
-        custom_definitions = []
-
-        for definition in all_definitions:
-            filters = definition.filters or {}
-            
-            # Check if filters exist, otherwise it's a generic definition
-            if filters:
-                match = all(
-                    event.get(key) == value 
-                    for key, value in filters.items()
-                    if key in event
-                )
-                if match:
-                    custom_definitions.append(definition)
-            else:
-                generic_definitions.append(definition)
+    @property
+    def is_limited(self) -> bool:
+        """
+        Check if this PipelineDefinition has a concurrency cap or a rate limit
+        """
+        return self.max_concurrency is not None or self.rate_limit is not None
 
-        # Return custom definitions if available, otherwise return generic ones
-        return custom_definitions if custom_definitions else generic_definitions
+    @property
+    def plan(self) -> object:
+        """
+        Get the cached `PipelinePlan` for this PipelineDefinition
+        """
+        return pipeline_plans.get(self)
 
     @property
     def defined_tasks(self) -> list[object]:
         """
         Get Tasks defined for this PipelineDefinition
         """
-        PipelineDefinitionTaskDefinition = apps.get_model('django_eventspipe.PipelineDefinitionTaskDefinition')
-
-        tasks = []
-
-        for definition in PipelineDefinitionTaskDefinition.objects.filter(
-            pipeline_definition=self, 
-            enabled=True
-        ).order_by('order'):
-            tasks.append(definition)
+        return list(self.plan.defined_tasks)
 
-        return tasks
-
-    def get_tasks_chain(self, context: dict[str, object]) -> chain:
+    def get_tasks_chain(
+        self, 
+        context: dict[str, object], 
+        tasks: list[object] | None = None, 
+        priority: int | None = None
+    ) -> chain:
         """
-        Get Tasks defined for this PipelineDefinition as a celery chain
+        Get Tasks defined for this PipelineDefinition as a celery chain.
+        Consecutive Tasks sharing the same stage run in parallel as a celery group, 
+        their contexts are merged before the next stage (requires a result backend).
+        Each signature carries the primary key and celery task id of its pipeline's `Task` object, if any,
+        and is routed to its queue with its priority, unless `priority` overrides it.
         """
-        task_chain = []
-        first = True
-
-        for definition in self.defined_tasks:
-            if first:
-                signature = import_string(definition.task_definition.function).s(context)
-                first = False
-            else:
-                signature = import_string(definition.task_definition.function).s()
-
-            task_chain.append(signature)
-
-        return chain(task_chain)
+        return self.plan.get_chain(context, tasks, priority)
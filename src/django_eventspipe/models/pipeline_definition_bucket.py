@@ -0,0 +1,21 @@
+from django.db import models
+from django.utils import timezone
+
+class PipelineDefinitionBucket(models.Model):
+    """
+    Rate limit token bucket of a `PipelineDefinition`,
+    its row also serializes admissions of the definition's Pipelines
+    """
+    definition = models.OneToOneField('django_eventspipe.PipelineDefinition', on_delete=models.CASCADE, primary_key=True)
+    tokens     = models.FloatField(default=0)
+    updated_ts = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def lock(cls, definition: object) -> object:
+        """
+        Get the bucket of a `PipelineDefinition`, locked until the current transaction ends
+        """
+        return cls.objects.select_for_update().get_or_create(
+            definition = definition,
+            defaults   = {"tokens": definition.rate_limit or 0}
+        )[0]
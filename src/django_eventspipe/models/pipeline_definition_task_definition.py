@@ -5,4 +5,25 @@ class PipelineDefinitionTaskDefinition(models.Model):
     task_definition     = models.ForeignKey('django_eventspipe.TaskDefinition', on_delete=models.CASCADE)
     enabled             = models.BooleanField(default=True)
     order               = models.IntegerField(default=20)
+    stage               = models.PositiveIntegerField(
+        blank     = True,
+        null      = True,
+        help_text = 'Consecutive Tasks sharing a stage run in parallel, empty to run this Task on its own'
+    )
+    queue               = models.CharField(
+        max_length = 128,
+        blank      = True,
+        default    = '',
+        help_text  = 'Celery queue of this Task, empty for the PipelineDefinition\'s queue'
+    )
+    priority = models.PositiveSmallIntegerField(
+        blank     = True,
+        null      = True,
+        help_text = 'Celery priority of this Task, empty for the PipelineDefinition\'s priority'
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["pipeline_definition", "order"], condition=models.Q(enabled=True), name="pdtd_enabled_order_idx"),
+        ]
 
@@ -0,0 +1,14 @@
+from django.db import models
+from django.utils import timezone
+
+class PipelineLog(models.Model):
+    """
+    A log line of a `Pipeline`
+    """
+    pipeline  = models.ForeignKey('django_eventspipe.Pipeline', on_delete=models.CASCADE)
+    task      = models.ForeignKey('django_eventspipe.Task', on_delete=models.SET_NULL, blank=True, null=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+    message   = models.TextField()
+
+    def __str__(self) -> str:
+        return self.message
@@ -1,6 +1,18 @@
-from django.db import models 
+import logging
+
+from celery import current_app
+from celery.utils import uuid
+
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import Case, Exists, F, OuterRef, Value, When
 from django.utils import timezone
 
+from django_eventspipe.limits import limited_definitions, schedule_release
+from django_eventspipe.utils import bulk_save
+
+logger = logging.getLogger(__name__)
+
 class Task(models.Model):
 
     STATUS_CHOICES = [
@@ -17,71 +29,123 @@ class Task(models.Model):
     definition = models.ForeignKey('django_eventspipe.PipelineDefinitionTaskDefinition', null=True, on_delete=models.SET_NULL)
     start_ts   = models.DateTimeField(blank=True, null=True)
     end_ts     = models.DateTimeField(blank=True, null=True)
+    celery_id  = models.CharField(max_length=255, blank=True, default="") # celery task id, to revoke it
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["pipeline", "status"], name="task_pipeline_status_idx"),
+        ]
 
     @classmethod
-    def create_tasks(cls, pipeline: object) -> list:
+    def new_tasks(cls, pipeline: object, defined_tasks: list) -> list:
         """
-        Create `Task` for a given pipeline
+        Get unsaved `Task` objects for a given pipeline
         """
-        tasks = []
-
-        for defined_task in pipeline.definition.defined_tasks:
-            # Create Task
-            task = cls(
+        return [
+            cls(
                 status     = 3,
                 pipeline   = pipeline,
-                definition = defined_task
+                definition = defined_task,
+                celery_id  = uuid()
             )
-            task.save()
-            tasks.append(task)
-    
-        return tasks
+            for defined_task in defined_tasks
+        ]
+
+    @classmethod
+    def create_tasks(cls, pipeline: object) -> list:
+        """
+        Create `Task` for a given pipeline
+        """
+        tasks = cls.new_tasks(pipeline, pipeline.definition.defined_tasks)
+
+        return bulk_save(cls, tasks)
 
     @classmethod
     def pipeline_failed(cls, pipeline: object) -> None:
         """
-        Set all queued `Task` as failed.
+        Set all queued and running `Task` as failed, 
+        and revoke their celery tasks once the transaction commits.
+        Running celery tasks are not terminated, they finish without overwriting their failed status.
         """
-        tasks = cls.objects.all().filter(status=3, pipeline=pipeline) # kill both queued and running
+        tasks = cls.objects.filter(pipeline=pipeline, status__in=[0, 3])
+
+        celery_ids = [celery_id for celery_id in tasks.values_list("celery_id", flat=True) if celery_id]
+
+        tasks.update(status=2, end_ts=timezone.now())
 
-        for task in tasks:
-            task.status = 2   
-            task.save()
+        if celery_ids and not current_app.conf.task_always_eager:
+            transaction.on_commit(lambda: cls.revoke(celery_ids))
+
+    @staticmethod
+    def revoke(celery_ids: list[str]) -> None:
+        """
+        Revoke celery tasks, a failed revoke only leaves them to run and fail
+        """
+        try:
+            current_app.control.revoke(celery_ids)
+        except Exception as exc:
+            logger.error("Unable to revoke %d tasks: %s" % (len(celery_ids), exc))
 
-    def tracking_start(self, node: str) -> None:
+    def tracking_start(self, node: str) -> bool:
         """
-        Start tracking a `Task`
+        Start tracking a queued `Task`, return False if it isn't queued anymore
+        (failed along with its pipeline)
         """
+        Pipeline = apps.get_model("django_eventspipe.Pipeline")
+
         self.status = 0
         self.node = node
         self.start_ts = timezone.now()
-        
-        # Increase Pipeline's current_task
-        self.pipeline.current_task += 1
 
-        # Set Pipeline's status as running
-        if self.pipeline.status != 0:
-            self.pipeline.status = 0
+        if not self.__class__.objects.filter(pk=self.pk, status=3).update(
+            status   = self.status,
+            node     = self.node,
+            start_ts = self.start_ts
+        ):
+            self.refresh_from_db(fields=["status", "node", "start_ts"])
+            return False
+
+        # Increase Pipeline's current_task and set a queued Pipeline as running
+        Pipeline.objects.filter(pk=self.pipeline_id).update(
+            current_task = F("current_task") + 1,
+            status       = Case(When(status=3, then=Value(0)), default=F("status")),
+        )
 
-        self.pipeline.save()
-        self.save()
+        return True
 
     def tracking_update(self, status: int) -> None:
         """
         Update `Task`'s tracking data
         """
+        Pipeline = apps.get_model("django_eventspipe.Pipeline")
+
         # Update this object
         self.status = status
         self.end_ts = timezone.now()
 
         if status == 1:
-            # Check if pipeline is completed
-            if self.pipeline.current_task == self.pipeline.tasks_count:
-                self.pipeline.status = status
-                self.pipeline.end_ts = timezone.now()
-                self.pipeline.save()
+            # A Task failed along with its pipeline meanwhile stays failed
+            if not self.__class__.objects.filter(pk=self.pk, status=0).update(
+                status = status,
+                end_ts = self.end_ts
+            ):
+                self.refresh_from_db(fields=["status", "end_ts"])
+                return
+
+            # Pipeline is completed once none of its Tasks is queued or running
+            completed = Pipeline.objects.filter(pk=self.pipeline_id, status=0).exclude(
+                Exists(self.__class__.objects.filter(pipeline=OuterRef("pk"), status__in=[0, 3]))
+            ).update(
+                status = status,
+                end_ts = self.end_ts
+            )
         else:
+            self.save(update_fields=["status", "end_ts"])
+
             # Set pipeline and all queued Tasks as failed
             self.pipeline.fail()
+            completed = True
 
-        self.save()
+        if completed and self.pipeline.definition_id in limited_definitions.data:
+            # A slot is free, start throttled Pipelines of the same definition
+            schedule_release(self.pipeline.definition_id)
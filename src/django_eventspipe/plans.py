@@ -0,0 +1,141 @@
+from itertools import groupby
+
+from celery import chain, group, signature as celery_signature
+
+from django.apps import apps
+from django.utils.module_loading import import_string
+
+from .routing import DEFINITIONS_VERSION_KEY
+from .utils import VersionedCache
+
+class PipelinePlan:
+    """
+    Compiled Tasks of a `PipelineDefinition`: ordered task definitions,
+    resolved celery tasks and signature templates grouped by stage.
+    """
+
+    def __init__(self, defined_tasks: list[object], queue: str = "", priority: int | None = None) -> None:
+        self.defined_tasks = defined_tasks
+        self.stages        = []
+
+        for key, definitions in groupby(defined_tasks, key=self.get_stage):
+            stage = []
+
+            for definition in definitions:
+                template = import_string(definition.task_definition.function).s()
+                template.set(**self.get_options(
+                    definition.queue or queue,
+                    definition.priority if definition.priority is not None else priority
+                ))
+                stage.append((definition.pk, template))
+
+            # merge_contexts follows the stage it merges
+            merge = celery_signature("django_eventspipe.tasks.merge_contexts")
+            merge.set(**stage[-1][1].options)
+
+            self.stages.append((stage, merge))
+
+    @staticmethod
+    def get_stage(definition: object) -> object:
+        """
+        Grouping key of a task definition, only tasks with an explicit stage run in parallel
+        """
+        if definition.stage is None:
+            return ("task", definition.pk)
+
+        return ("stage", definition.stage)
+
+    @staticmethod
+    def get_options(queue: str, priority: int | None) -> dict[str, object]:
+        """
+        Get celery routing options of a signature
+        """
+        options = {}
+
+        if queue:
+            options["queue"] = queue
+
+        if priority is not None:
+            options["priority"] = priority
+
+        return options
+
+    def get_chain(
+        self, 
+        context: dict[str, object], 
+        tasks: list[object] | None = None, 
+        priority: int | None = None
+    ) -> chain:
+        """
+        Get a celery chain cloning this plan's signatures,
+        `priority` overrides the priority of every signature
+        """
+        task_chain = []
+        first = True
+
+        # Map PipelineDefinitionTaskDefinition -> Task
+        pipeline_tasks = {task.definition_id: task for task in tasks or []}
+
+        # Event level priority
+        overrides = {} if priority is None else {"priority": priority}
+
+        for stage, merge in self.stages:
+            signatures = []
+
+            for definition_pk, template in stage:
+                options         = {}
+                routing_options = dict(overrides)
+
+                if definition_pk in pipeline_tasks:
+                    task = pipeline_tasks[definition_pk]
+                    options["pipeline_task"] = task.pk
+
+                    # Known celery task id, to revoke it on failure
+                    if task.celery_id:
+                        routing_options["task_id"] = task.celery_id
+
+                if first:
+                    signatures.append(template.clone(args=(context,), kwargs=options, **routing_options))
+                else:
+                    signatures.append(template.clone(kwargs=options, **routing_options))
+
+            if len(signatures) == 1:
+                task_chain.append(signatures[0])
+            else:
+                # Parallel stage, merge contexts returned by the group
+                task_chain.append(group(signatures))
+                task_chain.append(merge.clone(**overrides))
+
+            first = False
+
+        return chain(task_chain)
+
+class PipelinePlans(VersionedCache):
+    """
+    Process-local `PipelinePlan` objects by `PipelineDefinition` pk
+    """
+    version_key = DEFINITIONS_VERSION_KEY
+
+    def build(self) -> dict[int, PipelinePlan]:
+        return {}
+
+    def get(self, definition: object) -> PipelinePlan:
+        plans = self.data
+
+        if definition.pk not in plans:
+            PipelineDefinitionTaskDefinition = apps.get_model('django_eventspipe.PipelineDefinitionTaskDefinition')
+
+            plans[definition.pk] = PipelinePlan(
+                list(
+                    PipelineDefinitionTaskDefinition.objects.filter(
+                        pipeline_definition=definition,
+                        enabled=True
+                    ).select_related('task_definition').order_by('order', 'pk')
+                ),
+                queue    = definition.queue,
+                priority = definition.priority
+            )
+
+        return plans[definition.pk]
+
+pipeline_plans = PipelinePlans()
@@ -0,0 +1,252 @@
+import datetime
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# keep raw DELETE statements under the database parameters limit
+DELETE_CHUNK_SIZE = 500
+
+def delete_in(model: type, column: str, values: list[object]) -> int:
+    """
+    Run raw `DELETE ... WHERE column IN (...)` statements, skipping django's deletion collector
+    """
+    qn      = connection.ops.quote_name
+    deleted = 0
+
+    with connection.cursor() as cursor:
+        for i in range(0, len(values), DELETE_CHUNK_SIZE):
+            chunk = values[i:i + DELETE_CHUNK_SIZE]
+            cursor.execute(
+                "DELETE FROM %s WHERE %s IN (%s)" % (
+                    qn(model._meta.db_table),
+                    qn(column),
+                    ", ".join(["%s"] * len(chunk))
+                ),
+                chunk
+            )
+            deleted += cursor.rowcount
+
+    return deleted
+
+def delete_log_entries(model: type, pks: list[int]) -> int:
+    """
+    Run raw `DELETE` statements of the admin `LogEntry` objects of `model` objects among `pks`
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    object_ids   = [str(pk) for pk in pks]
+
+    qn      = connection.ops.quote_name
+    deleted = 0
+
+    with connection.cursor() as cursor:
+        for i in range(0, len(object_ids), DELETE_CHUNK_SIZE):
+            chunk = object_ids[i:i + DELETE_CHUNK_SIZE]
+            cursor.execute(
+                "DELETE FROM %s WHERE %s = %%s AND %s IN (%s)" % (
+                    qn(LogEntry._meta.db_table),
+                    qn("content_type_id"),
+                    qn("object_id"),
+                    ", ".join(["%s"] * len(chunk))
+                ),
+                [content_type.pk] + chunk
+            )
+            deleted += cursor.rowcount
+
+    return deleted
+
+def delete_pipelines(pks: list[int]) -> int:
+    """
+    Delete `Pipeline` objects along with their `Task`, `PipelineLog`, `PipelineArtifact` and `LogEntry` objects
+    """
+    Pipeline         = apps.get_model("django_eventspipe.Pipeline")
+    Task             = apps.get_model("django_eventspipe.Task")
+    PipelineLog      = apps.get_model("django_eventspipe.PipelineLog")
+    PipelineArtifact = apps.get_model("django_eventspipe.PipelineArtifact")
+
+    with transaction.atomic():
+        delete_in(PipelineLog, "pipeline_id", pks)
+        delete_in(PipelineArtifact, "pipeline_id", pks)
+        delete_in(Task, "pipeline_id", pks)
+
+        # admin log entries may exist whatever the current log sink is
+        delete_log_entries(Pipeline, pks)
+
+        return delete_in(Pipeline, "id", pks)
+
+def get_expired(
+    definition: object | None,
+    days: int | None,
+    failed_days: int | None,
+    keep_last: int
+) -> object:
+    """
+    Get completed `Pipeline` objects of a `PipelineDefinition` out of the retention policy.
+    Failed Pipelines are kept for `failed_days` when longer than `days`.
+    """
+    Pipeline = apps.get_model("django_eventspipe.Pipeline")
+
+    pipelines = Pipeline.objects.filter(definition=definition)
+    now       = timezone.now()
+
+    if days is None:
+        return pipelines.none()
+
+    failed_days = max(days, failed_days or 0)
+
+    pipelines = pipelines.filter(
+        Q(status=1, start_ts__lt=now - datetime.timedelta(days=days)) |
+        Q(status=2, start_ts__lt=now - datetime.timedelta(days=failed_days))
+    )
+
+    if keep_last > 0:
+        pipelines = pipelines.exclude(pk__in=list(
+            Pipeline.objects.filter(definition=definition).order_by("-pk").values_list("pk", flat=True)[:keep_last]
+        ))
+
+    return pipelines
+
+def prune_pipelines(
+    days: int | None = None,
+    failed_days: int | None = None,
+    keep_last: int | None = None,
+    batch_size: int | None = None
+) -> int:
+    """
+    Delete completed `Pipeline` objects older than their retention days,
+    `PipelineDefinition.retention_days` or `EVENTSPIPE_RETENTION_DAYS`.
+    Failed Pipelines are kept at least `EVENTSPIPE_RETENTION_FAILED_DAYS`
+    and the last `EVENTSPIPE_RETENTION_KEEP_LAST` Pipelines of each definition are always kept.
+    """
+    PipelineDefinition = apps.get_model("django_eventspipe.PipelineDefinition")
+
+    if days is None:
+        days = getattr(settings, "EVENTSPIPE_RETENTION_DAYS", None)
+
+    if failed_days is None:
+        failed_days = getattr(settings, "EVENTSPIPE_RETENTION_FAILED_DAYS", None)
+
+    if keep_last is None:
+        keep_last = getattr(settings, "EVENTSPIPE_RETENTION_KEEP_LAST", 0)
+
+    if batch_size is None:
+        batch_size = getattr(settings, "EVENTSPIPE_RETENTION_BATCH_SIZE", 1000)
+
+    # Pipelines of deleted definitions follow the default policy
+    scopes = [(None, days)] + [
+        (definition, definition.retention_days if definition.retention_days is not None else days)
+        for definition in PipelineDefinition.objects.only("pk", "retention_days")
+    ]
+    deleted = 0
+
+    for definition, definition_days in scopes:
+        expired = get_expired(definition, definition_days, failed_days, keep_last)
+
+        while True:
+            pks = list(expired.order_by("pk").values_list("pk", flat=True)[:batch_size])
+
+            if not pks:
+                break
+
+            deleted += delete_pipelines(pks)
+            logger.info("%d pipelines pruned" % deleted)
+
+    return deleted
+
+def prune_artifacts(batch_size: int | None = None) -> int:
+    """
+    Delete `Artifact` objects no longer referenced by a `PipelineArtifact`, and their stored files
+    """
+    Artifact         = apps.get_model("django_eventspipe.Artifact")
+    PipelineArtifact = apps.get_model("django_eventspipe.PipelineArtifact")
+
+    if batch_size is None:
+        batch_size = getattr(settings, "EVENTSPIPE_RETENTION_BATCH_SIZE", 1000)
+
+    orphans = Artifact.objects.exclude(
+        Exists(PipelineArtifact.objects.filter(artifact=OuterRef("pk")))
+    )
+    deleted = 0
+    last_pk = 0
+
+    while True:
+        batch = dict(orphans.filter(pk__gt=last_pk).order_by("pk").values_list("pk", "file")[:batch_size])
+
+        if not batch:
+            break
+
+        last_pk = max(batch)
+
+        with transaction.atomic():
+            # Artifacts referenced again in the meantime are kept
+            pks  = list(batch)
+            delete_orphans(pks)
+            kept = {
+                pk
+                for i in range(0, len(pks), DELETE_CHUNK_SIZE)
+                for pk in Artifact.objects.filter(pk__in=pks[i:i + DELETE_CHUNK_SIZE]).values_list("pk", flat=True)
+            }
+
+            files = [name for pk, name in batch.items() if name and pk not in kept]
+            transaction.on_commit(lambda files=files: delete_files(files))
+
+        deleted += len(batch) - len(kept)
+        logger.info("%d artifacts pruned" % deleted)
+
+    return deleted
+
+def delete_orphans(pks: list[int]) -> int:
+    """
+    Run raw `DELETE` statements of unreferenced `Artifact` objects among `pks`
+    """
+    Artifact         = apps.get_model("django_eventspipe.Artifact")
+    PipelineArtifact = apps.get_model("django_eventspipe.PipelineArtifact")
+
+    qn       = connection.ops.quote_name
+    artifact = qn(Artifact._meta.db_table)
+    deleted  = 0
+
+    with connection.cursor() as cursor:
+        for i in range(0, len(pks), DELETE_CHUNK_SIZE):
+            chunk = pks[i:i + DELETE_CHUNK_SIZE]
+            cursor.execute(
+                "DELETE FROM %s WHERE %s IN (%s) AND NOT EXISTS (SELECT 1 FROM %s WHERE %s = %s.%s)" % (
+                    artifact,
+                    qn("id"),
+                    ", ".join(["%s"] * len(chunk)),
+                    qn(PipelineArtifact._meta.db_table),
+                    qn("artifact_id"),
+                    artifact,
+                    qn("id")
+                ),
+                chunk
+            )
+            deleted += cursor.rowcount
+
+    return deleted
+
+def delete_files(names: list[str]) -> None:
+    """
+    Delete artifact files from the artifact storage
+    """
+    Artifact = apps.get_model("django_eventspipe.Artifact")
+
+    storage = Artifact._meta.get_field("file").storage
+
+    for name in names:
+        storage.delete(name)
+
+def prune(**options) -> tuple[int, int]:
+    """
+    Apply retention policies, then delete unreferenced artifacts
+    """
+    batch_size = options.get("batch_size")
+
+    return prune_pipelines(**options), prune_artifacts(batch_size)
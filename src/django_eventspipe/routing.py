@@ -0,0 +1,96 @@
+import json
+
+from django.apps import apps
+
+from .utils import VersionedCache
+
+DEFINITIONS_VERSION_KEY = "django_eventspipe:definitions_version"
+
+class FilterMatcher:
+    """
+    Pre-compiled `PipelineDefinition.filters` matcher.
+    Filter keys missing from the event are ignored.
+    """
+    __slots__ = ("items",)
+
+    def __init__(self, filters: dict[str, object]) -> None:
+        self.items = tuple(filters.items())
+
+    @staticmethod
+    def key(filters: dict[str, object]) -> tuple:
+        """
+        Hashable key of a filters dictionary, definitions sharing
+        the same filters share the same matcher
+        """
+        return tuple(sorted(
+            (key, json.dumps(value, sort_keys=True))
+            for key, value in filters.items()
+        ))
+
+    def __call__(self, event: dict[str, object]) -> bool:
+        for key, value in self.items:
+            if key in event and event[key] != value:
+                return False
+        return True
+
+class RoutingIndex(VersionedCache):
+    """
+    Process-local index of enabled `PipelineDefinition` objects by event name.
+    """
+    version_key = DEFINITIONS_VERSION_KEY
+
+    def build(self) -> dict[str, tuple]:
+        """
+        Load enabled definitions and compile their filters
+        """
+        PipelineDefinition = apps.get_model("django_eventspipe.PipelineDefinition")
+
+        routes   = {}
+        matchers = {}
+
+        for definition in PipelineDefinition.objects.filter(enabled=True).order_by("pk"):
+            generic, custom = routes.setdefault(definition.event, ([], {}))
+            filters = definition.filters or {}
+
+            if not filters:
+                generic.append(definition)
+                continue
+
+            key = FilterMatcher.key(filters)
+            if key not in matchers:
+                matchers[key] = FilterMatcher(filters)
+
+            custom.setdefault(key, (matchers[key], []))[1].append(definition)
+
+        return {
+            event: (tuple(generic), tuple(custom.values()))
+            for event, (generic, custom) in routes.items()
+        }
+
+    def get_definitions(self, event: dict[str, object]) -> list[object]:
+        """
+        Get pipeline definitions for a given event.
+        """
+        route = self.data.get(event["name"])
+
+        if route is None:
+            return []
+
+        generic, custom = route
+
+        matched = [
+            definition
+            for matcher, definitions in custom
+            if matcher(event)
+            for definition in definitions
+        ]
+
+        if not matched:
+            return list(generic)
+
+        if len(custom) > 1:
+            matched.sort(key=lambda definition: definition.pk)
+
+        return matched
+
+routing_index = RoutingIndex()
@@ -1,42 +1,157 @@
+import heapq
+import itertools
 import logging
+import time
 
-from celery.beat import Scheduler
-from .models import EventSchedule
+from celery import signature as celery_signature
+from celery.beat import Scheduler, ScheduleEntry
+from django.conf import settings
+
+from .models import EventSchedule, EventScheduleVersion
 
 logger = logging.getLogger(__name__)
 
 class DynamicScheduler(Scheduler):
+    """
+    Celery beat scheduler for `EventSchedule` objects.
+    Entries are kept in a min-heap keyed on their next fire time,
+    only entries that fired or changed get their schedule evaluated again.
+    `EventSchedule` entries due in the same tick are sent in batches
+    carrying their events inline.
+    """
 
     def __init__(self, app, *args, **kwargs) -> None:
         """
         Initialize the scheduler and set up the schedule.
         """
+        self.schedule_version = None
+        self.payloads         = {}  # entry name -> (user pk, event)
+        self._counter = itertools.count()
         super().__init__(app, *args, **kwargs)
-        self.current_hash = None
         self.sync()  # Initialize the schedule on startup
 
+    def push(self, entry: ScheduleEntry, now: float | None = None) -> None:
+        """
+        Add an entry to the heap at its next fire time
+        """
+        if self._heap is None:
+            # heap is populated on the next tick
+            return
+
+        is_due, next_time_to_run = self.is_due(entry)
+        when = (now or time.time()) + (0 if is_due else next_time_to_run)
+
+        heapq.heappush(self._heap, (when, next(self._counter), entry))
+
+    def populate_heap(self, *args, **kwargs) -> None:
+        """
+        Populate the heap with the data contained in the schedule.
+        """
+        self._heap = []
+        now = time.time()
+
+        for entry in self.schedule.values():
+            self.push(entry, now)
+
+    def tick(self, *args, **kwargs) -> float:
+        """
+        Run a tick, apply every due entry.
+        Return the delay in seconds before the next tick.
+        """
+        if self.should_sync():
+            self._do_sync()
+
+        if self._heap is None:
+            self.populate_heap()
+
+        now = time.time()
+        due = []
+
+        while self._heap and self._heap[0][0] <= now:
+            _, _, entry = heapq.heappop(self._heap)
+
+            # Skip removed or replaced entries
+            if self.schedule.get(entry.name) is not entry:
+                continue
+
+            is_due, next_time_to_run = self.is_due(entry)
+
+            if is_due:
+                next_entry = self.reserve(entry)
+
+                if entry.name in self.payloads:
+                    due.append(self.payloads[entry.name])
+                else:
+                    self.apply_entry(entry, producer=self.producer)
+
+                entry = next_entry
+
+            heapq.heappush(self._heap, (now + next_time_to_run, next(self._counter), entry))
+
+        if due:
+            self.apply_schedules(due)
+
+        if not self._heap:
+            return self.max_interval
+
+        return min(max(self._heap[0][0] - time.time(), 0), self.max_interval)
+
+    def apply_schedules(self, payloads: list[tuple[int, dict[str, object]]]) -> None:
+        """
+        Send due `EventSchedule` events in batches of `EVENTSPIPE_SCHEDULE_BATCH_SIZE`
+        """
+        batch_size = getattr(settings, "EVENTSPIPE_SCHEDULE_BATCH_SIZE", 500)
+
+        logger.info("Scheduler: Sending %d due schedules", len(payloads))
+
+        for i in range(0, len(payloads), batch_size):
+            try:
+                celery_signature(
+                    "django_eventspipe.tasks.trigger_schedules",
+                    args = (payloads[i:i + batch_size],)
+                ).apply_async(producer=self.producer)
+            except Exception as exc:
+                logger.error("Message Error: %s", exc, exc_info=True)
+
     def sync(self) -> None:
         """
         Sync the schedule immediately without waiting for the next tick.
+        Only `EventSchedule` objects changed since the last sync are fetched.
         """
-        logger.info("Updating schedule from database...")
-
-        # Compute the new schedule hash
-        new_hash = EventSchedule.compute_hash()
+        # Get the current schedules version
+        version = EventScheduleVersion.current()
 
         # If the schedule hasn't changed, skip the update
-        if new_hash == self.current_hash:
-            logger.info("No changes detected in schedule.")
+        if version == self.schedule_version:
+            logger.debug("No changes detected in schedule.")
             return
 
-        # Fetch enabled schedules from the database
-        schedules = EventSchedule.objects.filter(enabled=True)
+        logger.info("Updating schedule from database...")
+
+        if self.schedule_version is None:
+            # First sync, load every enabled schedule
+            schedules = EventSchedule.objects.filter(enabled=True)
+        else:
+            schedules = EventSchedule.objects.filter(version__gt=self.schedule_version)
+
+        changed = 0
 
         # Loop through schedules and update only changed or new entries
         for schedule in schedules:
+            changed += 1
+
+            if not schedule.enabled:
+                self.payloads.pop(schedule.entry_name, None)
+                if self.schedule.pop(schedule.entry_name, None) is not None:
+                    logger.info(f"Removed task: {schedule.entry_name}")
+                continue
+
+            self.payloads[schedule.entry_name] = (schedule.user_id, schedule.event)
+
             if schedule.entry_name not in self.schedule:
                 # Add a new schedule entry
                 self.schedule[schedule.entry_name] = schedule.entry
+                self.push(self.schedule[schedule.entry_name])
                 logger.info(f"Added new task: {schedule.entry_name}")
 
             else:
@@ -44,15 +159,24 @@ class DynamicScheduler(Scheduler):
                 existing_task = self.schedule[schedule.entry_name]
                 if existing_task.schedule != schedule.schedule:
                     self.schedule[schedule.entry_name] = schedule.entry
+                    self.push(self.schedule[schedule.entry_name])
                     logger.info(f"Updated existing task: {schedule.entry_name}")
 
-        # Remove tasks that are no longer present in the database
-        current_task_ids = {s.entry_name for s in schedules}
-        to_remove = [task_id for task_id in self.schedule if task_id not in current_task_ids]
+        # Versions not matching a changed schedule may be removed schedules
+        if self.schedule_version is not None and version - self.schedule_version > changed:
+            current_task_ids = {
+                "schedule-%d" % pk 
+                for pk in EventSchedule.objects.filter(enabled=True).values_list("pk", flat=True)
+            }
+            to_remove = [
+                task_id for task_id in self.schedule 
+                if task_id.startswith("schedule-") and task_id not in current_task_ids
+            ]
 
-        for task_id in to_remove:
-            del self.schedule[task_id]
-            logger.info(f"Removed task: {task_id}")
+            for task_id in to_remove:
+                del self.schedule[task_id]
+                self.payloads.pop(task_id, None)
+                logger.info(f"Removed task: {task_id}")
 
-        # Update the current hash and last update time
-        self.current_hash = new_hash
+        # Update the current version
+        self.schedule_version = version
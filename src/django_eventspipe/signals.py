@@ -1,12 +1,25 @@
 import logging
 
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import Signal, receiver
 from django.contrib.auth.models import User
 
-from .models import Pipeline
+from .models import (
+    Pipeline,
+    PipelineDefinition,
+    PipelineDefinitionTaskDefinition,
+    TaskDefinition,
+    EventSchedule,
+    EventScheduleVersion
+)
+from .limits import limited_definitions
+from .plans import pipeline_plans
+from .routing import routing_index
 
 logger = logging.getLogger(__name__)
 event_signal = Signal()
+events_signal = Signal()
 
 @receiver(event_signal)
 def create_pipelines(
@@ -20,3 +33,32 @@ def create_pipelines(
     logger.info("executing '%s'" % str(event))
     Pipeline.new_from_event(sender, event)
 
+@receiver(events_signal)
+def create_pipelines_batch(
+    sender: User,
+    events: list[dict[str, object]],
+    **kwargs
+) -> None:
+    """
+    Signal handler to create `Pipeline` objects from a batch of events
+    """
+    logger.info("executing %d events" % len(events))
+    Pipeline.new_from_events(sender, events)
+
+@receiver([post_save, post_delete], sender=PipelineDefinition)
+@receiver([post_save, post_delete], sender=PipelineDefinitionTaskDefinition)
+@receiver([post_save, post_delete], sender=TaskDefinition)
+def invalidate_definitions(sender: type, **kwargs) -> None:
+    """
+    Signal handler to drop cached `PipelineDefinition` routes, plans and limits
+    """
+    transaction.on_commit(routing_index.invalidate)
+    transaction.on_commit(pipeline_plans.invalidate)
+    transaction.on_commit(limited_definitions.invalidate)
+
+@receiver(post_delete, sender=EventSchedule)
+def bump_schedules_version(sender: type, **kwargs) -> None:
+    """
+    Signal handler to notify schedulers of a removed `EventSchedule`
+    """
+    EventScheduleVersion.bump()
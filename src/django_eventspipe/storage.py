@@ -0,0 +1,66 @@
+import io
+import os
+
+from typing import BinaryIO, Iterable, Iterator
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, Storage, storages
+
+def get_artifact_storage() -> Storage:
+    """
+    Get the `Storage` used for artifacts bigger than `EVENTSPIPE_ARTIFACT_DB_THRESHOLD`.
+    `EVENTSPIPE_ARTIFACT_STORAGE` may name an alias of django's `STORAGES` setting,
+    otherwise files are stored on `EVENTSPIPE_ARTIFACT_ROOT`.
+    """
+    alias = getattr(settings, "EVENTSPIPE_ARTIFACT_STORAGE", None)
+
+    if alias is not None:
+        return storages[alias]
+
+    return FileSystemStorage(
+        location=getattr(settings, "EVENTSPIPE_ARTIFACT_ROOT", os.path.join(settings.MEDIA_ROOT, "artifacts"))
+    )
+
+def get_artifact_path(checksum: str) -> str:
+    """
+    Get a content-addressed path for an artifact, sharded by its checksum
+    """
+    return "%s/%s/%s" % (checksum[:2], checksum[2:4], checksum)
+
+def iter_bytes(data: bytes | BinaryIO | Iterable[bytes], chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """
+    Iterate over bytes, a file-like object or an iterator of bytes by chunks
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        yield bytes(data)
+
+    elif hasattr(data, "read"):
+        while chunk := data.read(chunk_size):
+            yield chunk
+
+    else:
+        yield from data
+
+class ChunksReader(io.RawIOBase):
+    """
+    Read-only file-like object over an iterator of bytes
+    """
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks = iter(chunks)
+        self.buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray) -> int:
+        while not self.buffer:
+            try:
+                self.buffer = next(self.chunks)
+            except StopIteration:
+                return 0
+
+        size = min(len(buffer), len(self.buffer))
+        buffer[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+
+        return size
@@ -1,7 +1,11 @@
 from celery import shared_task
 
-from .signals import event_signal
-from .models import EventSchedule
+from django.contrib.auth.models import User
+
+from . import retention
+from .signals import event_signal, events_signal
+from .models import EventSchedule, Pipeline, PipelineDefinition
+from .utils import get_sentinel_user
 
 @shared_task
 def __trigger_event_schedule(schedule_pk: int) -> None:
@@ -10,3 +14,61 @@ def __trigger_event_schedule(schedule_pk: int) -> None:
     """
     schedule = EventSchedule.objects.get(pk=schedule_pk)
     event_signal.send(sender=schedule.user, event=schedule.event)
+
+@shared_task
+def trigger_events(user_pk: int, events: list[dict[str, object]]) -> None:
+    """
+    This task trigger a batch of events
+    """
+    user = User.objects.get(pk=user_pk)
+    events_signal.send(sender=user, events=events)
+
+@shared_task
+def trigger_schedules(schedules: list[tuple[int, dict[str, object]]]) -> None:
+    """
+    This task trigger the events of a batch of due `EventSchedule` objects,
+    events are grouped by user
+    """
+    events = {}
+
+    for user_pk, event in schedules:
+        events.setdefault(user_pk, []).append(event)
+
+    users = User.objects.in_bulk(list(events))
+
+    for user_pk, user_events in events.items():
+        user = users.get(user_pk) or get_sentinel_user()
+        events_signal.send(sender=user, events=user_events)
+
+@shared_task
+def release_pipelines(definition_pk: int | None = None) -> None:
+    """
+    This task start throttled Pipelines of a PipelineDefinition,
+    or of every PipelineDefinition when none is given
+    """
+    definitions = PipelineDefinition.objects.filter(pipeline__status=4).distinct()
+
+    if definition_pk is not None:
+        definitions = definitions.filter(pk=definition_pk)
+
+    for definition in definitions:
+        Pipeline.release(definition)
+
+@shared_task
+def prune_history() -> None:
+    """
+    This task apply retention policies and delete unreferenced artifacts
+    """
+    retention.prune()
+
+@shared_task
+def merge_contexts(contexts: list[dict[str, object]]) -> dict[str, object]:
+    """
+    This task merge contexts returned by Tasks running in parallel
+    """
+    context = {}
+
+    for data in contexts:
+        context.update(data)
+
+    return context
@@ -1,3 +1,39 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from django_eventspipe.management.commands.eventspipe_audit_queries import SCAN_PATTERNS, Command
+
+class HotQueriesTestCase(TestCase):
+    """
+    Hot lookups must be served by indexes and keep their number of queries
+    """
+
+    def setUp(self):
+        self.audit = Command()
+
+    def test_hot_queries_use_indexes(self):
+        pattern = SCAN_PATTERNS.get(connection.vendor)
+
+        if pattern is None:
+            self.skipTest("EXPLAIN audit not supported on %s" % connection.vendor)
+
+        for name, queryset in self.audit.get_hot_queries():
+            with self.subTest(name):
+                plan = self.audit.explain(queryset)
+
+                self.assertEqual(
+                    [line.strip() for line in plan.splitlines() if pattern.search(line)],
+                    [],
+                    plan
+                )
+
+    def test_query_budgets(self):
+        for name, budget, path in self.audit.get_query_budgets():
+            with self.subTest(name), self.assertNumQueries(budget):
+                path()
+
+    def test_audit_command(self):
+        call_command("eventspipe_audit_queries", stdout=io.StringIO())
@@ -1,6 +1,13 @@
 import json
+import time
+import threading
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, connections, models
 from django.urls import reverse
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
@@ -11,6 +18,78 @@ def get_sentinel_user() -> User:
     """
     return get_user_model().objects.get_or_create(username="deleted")[0]
 
+def bulk_save(model: type[models.Model], objects: list) -> list:
+    """
+    Insert many objects at once, falling back to a save per object
+    on databases unable to return primary keys from bulk inserts.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objects)
+
+    for obj in objects:
+        obj.save(force_insert=True)
+
+    return objects
+
+def get_version(key: str) -> int:
+    """
+    Get a shared version number, used to invalidate process-local caches.
+    Versions are kept in the default cache, it must be shared by every web and celery worker.
+    """
+    # seed with a timestamp, so an evicted key never goes back to a known version
+    return cache.get_or_set(key, time.time_ns, timeout=None)
+
+def bump_version(key: str) -> int:
+    """
+    Increase a shared version number
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # key evicted, start over from a fresh value
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.incr(key)
+
+class VersionedCache:
+    """
+    Process-local cache, rebuilt when its shared version changes
+    or when it gets older than `EVENTSPIPE_CACHE_TTL` seconds.
+    With a process-local default cache, changes only reach other processes after `EVENTSPIPE_CACHE_TTL`.
+    """
+    version_key = None
+
+    def __init__(self) -> None:
+        self._lock    = threading.Lock()
+        self._data    = None
+        self._version = None
+        self._expires = 0
+
+    def build(self) -> object:
+        raise NotImplementedError
+
+    def invalidate(self) -> None:
+        """
+        Drop this cache and notify other processes
+        """
+        bump_version(self.version_key)
+        self._data = None
+
+    def is_stale(self, version: int) -> bool:
+        return self._data is None or self._version != version or time.monotonic() > self._expires
+
+    @property
+    def data(self) -> object:
+        version = get_version(self.version_key)
+
+        if self.is_stale(version):
+            with self._lock:
+                if self.is_stale(version):
+                    self._data    = self.build()
+                    self._version = version
+                    self._expires = time.monotonic() + getattr(settings, "EVENTSPIPE_CACHE_TTL", 60)
+
+        return self._data
+
 def linkify(field_path: str) -> str:
     """
     Converts a foreign key value or foreign keys of foreign keys into clickable links.
@@ -40,6 +119,73 @@ def linkify(field_path: str) -> str:
     _linkify.short_description = field_path.replace('.', ' -> ')  # Sets column name
     return _linkify
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator using the database's row estimate as count of unfiltered big tables,
+    above `EVENTSPIPE_ADMIN_ESTIMATE_THRESHOLD` rows (PostgreSQL and MySQL only).
+    """
+    @cached_property
+    def count(self) -> int:
+        query = getattr(self.object_list, "query", None)
+
+        if query is not None and not query.where:
+            estimate = self.estimate()
+
+            if estimate is not None and estimate > getattr(settings, "EVENTSPIPE_ADMIN_ESTIMATE_THRESHOLD", 10000):
+                return estimate
+
+        return super().count
+
+    def estimate(self) -> int | None:
+        """
+        Get the planner's row estimate of the paginated table
+        """
+        connection = connections[self.object_list.db]
+        table      = self.object_list.model._meta.db_table
+
+        if connection.vendor == "postgresql":
+            sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+        elif connection.vendor == "mysql":
+            sql = "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s"
+        else:
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+
+        return int(row[0]) if row and row[0] is not None else None
+
+def parse_range_header(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single "bytes=start-end" HTTP Range header, 
+    return inclusive (start, end) or None when the range should be ignored.
+    Raise ValueError when the range is not satisfiable.
+    """
+    unit, _, ranges = header.partition("=")
+
+    if unit.strip() != "bytes" or "," in ranges:
+        # unknown unit or multiple ranges, serve the whole file
+        return None
+
+    first, _, last = ranges.strip().partition("-")
+
+    try:
+        if first:
+            start = int(first)
+            end   = int(last) if last else size - 1
+        else:
+            # suffix range, last N bytes
+            start = max(size - int(last), 0)
+            end   = size - 1
+    except ValueError:
+        return None
+
+    if start > end or start >= size:
+        raise ValueError("Range not satisfiable")
+
+    return start, min(end, size - 1)
+
 def cronexp(field: str):
     """
     Representation of cron expression.
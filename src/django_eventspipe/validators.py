@@ -78,10 +78,11 @@ class _CronRange(crontab.CronRange):
 
 def crontab_validator(value):
     """Validate crontab."""
-    try:
-        _CronSlices.validate(value)
-    except ValueError as e:
-        raise ValidationError(e)
+    from .cron import get_cron
+
+    error = get_cron(value).error
+    if error is not None:
+        raise ValidationError(error)
 
 
 def minute_validator(value):
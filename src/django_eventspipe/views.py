@@ -1,16 +1,85 @@
-from django.http import HttpRequest, HttpResponse
+import re
+
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from django.contrib.auth.decorators import login_required
 
+from .compression import CONTENT_ENCODINGS
 from .models import PipelineArtifact
+from .utils import parse_range_header
 
 @login_required
 def get_artifact(request: HttpRequest, artifact_id: int) -> HttpResponse:
     """
-    Get a file from Database
+    Stream a file from Database or storage, supporting ETag and single byte ranges.
+    Compressed files are served as is when the client accepts their encoding,
+    byte ranges of compressed files are decompressed from their first byte.
     """
-    file = PipelineArtifact.objects.get(pk=artifact_id)
+    file = get_object_or_404(
+        PipelineArtifact.objects.select_related("artifact").defer("artifact__data"),
+        pk=artifact_id
+    )
+    etag     = '"%s"' % file.artifact.checksum
+    encoding = CONTENT_ENCODINGS.get(file.artifact.codec)
+
+    if encoding is not None and (
+        "Range" in request.headers 
+        or not re.search(r"\b%s\b" % encoding, request.headers.get("Accept-Encoding", ""))
+    ):
+        # serve decompressed content
+        encoding = None
+
+    if encoding is not None:
+        etag = '"%s-%s"' % (file.artifact.checksum, encoding)
+
+    # Client already has this file
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+
+    if encoding is not None:
+        response = StreamingHttpResponse(
+            file.artifact.iter_stored_chunks(),
+            content_type='application/octet-stream'
+        )
+        response['Content-Disposition']='attachment;filename=%s' % file.file_name
+        response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        return response
 
-    response = HttpResponse(file.artifact.data, content_type='application/octet-stream')
+    size  = file.artifact.size
+    start = 0
+    end   = size - 1
+
+    # Serve a byte range, ignore it if it refers to another version of this file
+    if "Range" in request.headers and request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = parse_range_header(request.headers["Range"], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */%d' % size
+            return response
+
+        if byte_range is not None:
+            start, end = byte_range
+
+    response = StreamingHttpResponse(
+        file.artifact.iter_chunks(start, end), 
+        content_type='application/octet-stream',
+        status=206 if (start, end) != (0, size - 1) else 200
+    )
     response['Content-Disposition']='attachment;filename=%s' % file.file_name
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+
+    if response.status_code == 206:
+        response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, size)
+
+    if file.artifact.codec in CONTENT_ENCODINGS:
+        patch_vary_headers(response, ("Accept-Encoding",))
 
     return response